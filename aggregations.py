@@ -0,0 +1,76 @@
+import pandas as pd
+
+import cube
+import preprocess
+
+PRAZO_LABELS = {True: 'Dentro do Prazo', False: 'Fora do Prazo'}
+
+
+# Agregações de cada gráfico dos dashboards. Recebem as estruturas de um
+# datasets.Dataset (os cubos já recortados no período do gráfico) e devolvem o
+# frame pequeno que vai para o Altair.
+
+def _semana_descricao(df):
+    df['semana_descricao'] = df['semana'].astype(str) + 'ª Semana'
+    return df
+
+
+def veiculos_por_mes(veiculos_cube):
+    result = cube.rollup(veiculos_cube, ['mes'])
+    result['mes'] = preprocess.mes_labels(result['mes'])
+    return result
+
+
+def veiculos_por_semana(veiculos_mes):
+    return _semana_descricao(cube.rollup(veiculos_mes, ['semana']))
+
+
+def veiculos_por_marca(veiculos_mes):
+    return cube.rollup(veiculos_mes, ['marca'])
+
+
+def veiculos_por_modelo(veiculos_mes, marca):
+    return cube.rollup(veiculos_mes[veiculos_mes['marca'] == marca], ['modelo'])
+
+
+def prazo_status(veiculos_mes):
+    result = cube.rollup(veiculos_mes, ['dentro_prazo'])
+    result['dentro_prazo'] = result['dentro_prazo'].map(PRAZO_LABELS)
+    return result
+
+
+def marca_prazo_status(veiculos_mes):
+    result = cube.rollup(veiculos_mes, ['marca', 'dentro_prazo'])
+    result['dentro_prazo'] = result['dentro_prazo'].map(PRAZO_LABELS)
+    return result
+
+
+def mapa_calor(veiculos_mes):
+    result = cube.rollup(veiculos_mes, ['dia', 'dentro_prazo'])
+    result['Prazo'] = result['dentro_prazo'].map(PRAZO_LABELS)
+    return result
+
+
+# Valores dos cards de "Kits Faturados": kits distintos em D-1, na semana ISO e no mês
+# atuais, lidos do índice de chaves distintas (kpi.DistinctKeyIndex)
+def kits_cards(kpi_index, now):
+    dia_anterior = pd.Timestamp(now).normalize() - pd.Timedelta(days=1)
+    return {
+        'd1': kpi_index.count_day(dia_anterior),
+        'semana': kpi_index.count_week(now),
+        'mes': kpi_index.count_month(preprocess.current_period_code(now)),
+    }
+
+
+def kits_por_mes(kits_ano):
+    result = cube.rollup(kits_ano, ['mes'])
+    result['mes'] = preprocess.mes_labels(result['mes'])
+    return result
+
+
+def kits_por_semana(kits_mes):
+    return _semana_descricao(cube.rollup(kits_mes, ['semana']))
+
+
+def kits_por_dia(kits_periodo):
+    return cube.rollup(kits_periodo, ['data']).rename(columns={'data': 'dt_faturado'})
@@ -1,12 +1,54 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
-import awswrangler as wr
+import pandas as pd
 from datetime import datetime
 
+import config
+import datasets
+import instrumentation
+import preprocess
+import refresh
+import resolution
+
+# Copy-on-write: recortes e colunas derivadas não copiam os frames compartilhados entre sessões
+pd.set_option("mode.copy_on_write", True)
+
 # Configurações iniciais
 st.set_page_config(page_title="Dashboard de Veículos e Kits")
-@st.cache_data(ttl=300)
+
+# Atualizador único do processo: pré-carrega todos os conjuntos de dados assim que o
+# servidor sobe (ninguém espera o Athena depois de um restart) e os atualiza
+# periodicamente em segundo plano. O dashboard aberto passa o seu para a frente da fila.
+@st.cache_resource
+def get_refresher():
+    refresher = refresh.Refresher(datasets.BUILDERS, config.REFRESH_INTERVAL, config.LOAD_WORKERS).start()
+    for name in datasets.BUILDERS:
+        refresher.prefetch(name)
+    return refresher
+
+refresher = get_refresher()
+
+# Dados de um dashboard: pede a carga com prioridade, pré-carrega os demais conjuntos
+# e só mostra o aviso de carregamento se ainda não houver versão pronta
+def load_dataset(name):
+    if not refresher.is_ready(name):
+        refresher.request(name, priority=True)
+    for other in datasets.BUILDERS:
+        if other != name:
+            refresher.prefetch(other)
+
+    with instrumentation.section(f"Carga de dados ({name})"):
+        if refresher.is_ready(name):
+            dataset = refresher.get(name)
+        else:
+            with st.spinner("Carregando dados..."):
+                dataset = refresher.get(name)
+
+    if dataset is None:
+        st.error("Não foi possível carregar os dados. Tente novamente em alguns minutos.")
+        instrumentation.end_run()
+        st.stop()
+    return dataset
 
 # Função para autenticação
 def authenticate(username, password):
@@ -26,129 +68,71 @@ def show_login():
         else:
             st.error("Invalid username or password")
 
-# Verificar autenticação
-if 'authenticated' not in st.session_state:
-    st.session_state.authenticated = False
-
-if not st.session_state.authenticated:
-    show_login()
-else:
-    # Conexão com a fonte de dados
-    @st.cache_resource
-    def get_veiculos_data():
-        query = "SELECT * FROM vw_veiculos_finalizados"
-        df = wr.athena.read_sql_query(query, database="jira_sbm")
-        return df
-
-    @st.cache_resource
-    def get_kits_data():
-        query = "SELECT * FROM vw_vidros_kits"
-        df = wr.athena.read_sql_query(query, database="jira_sbm")
-        return df
-
-    veiculos_data = get_veiculos_data()
-    kits_data = get_kits_data()
-
-    # Processamento e exibição dos dados
-    def process_and_display_data(data, kits_data):
-        # Processamento dos dados de veículos
-        if 'dt_finalizacao' in data.columns:
-            data['dt_finalizacao'] = pd.to_datetime(data['dt_finalizacao'], errors='coerce')
-            data.dropna(subset=['dt_finalizacao'], inplace=True)
-        else:
-            st.error("Coluna 'dt_finalizacao' não encontrada na tabela de veículos.")
-            return
-        
-         # Adiciona colunas de tempo
-        data['mes'] = data['dt_finalizacao'].dt.to_period('M').astype(str)
-        data['semana'] = data['dt_finalizacao'].dt.to_period('W').astype(str)
-        data['dia'] = data['dt_finalizacao'].dt.date
-        data['ano'] = data['dt_finalizacao'].dt.to_period('a').astype(str)
-        
-        # Processamento dos dados de kits
-        if 'dt_faturado' in kits_data.columns:
-            kits_data['dt_faturado'] = pd.to_datetime(kits_data['dt_faturado'], errors='coerce')
-            kits_data.dropna(subset=['dt_faturado'], inplace=True)
-        else:
-            st.error("Coluna 'dt_faturado' não encontrada na tabela de kits.")
-            return
-
-        kits_data['mes'] = kits_data['dt_faturado'].dt.to_period('M').astype(str)
-        kits_data['semana'] = kits_data['dt_faturado'].dt.to_period('W').astype(str)
-        kits_data['dia'] = kits_data['dt_faturado'].dt.date
-        kits_data['ano'] = kits_data['dt_faturado'].dt.year
-        kits_data['semana_numero'] = (kits_data['dt_faturado'].dt.day - 1) // 7 + 1
-        kits_data['semana_descricao'] = kits_data['dt_faturado'].dt.strftime('%B %Y') + ' - Semana ' + kits_data['semana_numero'].astype(str)
-        mes_atual = datetime.now().strftime('%Y-%m')
-
-        return kits_data, mes_atual
-
-    kits_data, mes_atual = process_and_display_data(veiculos_data, kits_data)
-
-    # Configurações dos dashboards
-    st.sidebar.title(f"Bem-vindo, {st.session_state.username.split('.')[0].capitalize()}")
-    dashboard = st.sidebar.selectbox("Selecione o Dashboard", ["Veículos Finalizados", "Termômetro de Prazo", "Kits Faturados"])
-    st.logo("logo.png")
-
-    chart_width = 400  # Largura dos gráficos
-    chart_height = 400  # Altura dos gráficos
+chart_width = 400  # Largura dos gráficos
+chart_height = 400  # Altura dos gráficos
 
-    if dashboard == "Veículos Finalizados":
-        st.title("Veículos Finalizados")
+# Índice do mês atual entre os meses disponíveis (ou do último mês, se o atual não tiver dados)
+def indice_mes_atual(meses_disponiveis, mes_atual):
+    return list(meses_disponiveis).index(mes_atual) if mes_atual in meses_disponiveis else max(0, list(meses_disponiveis).index(sorted(meses_disponiveis)[-1]))
 
-        # Campo de entrada para o usuário pesquisar pelo número da OS
-        os_number = st.text_input('Digite o número da OS para pesquisa:', '')
+# Seções dos dashboards. Cada seção é um fragmento com seus próprios seletores e sua
+# agregação: interagir com um gráfico reexecuta só aquele fragmento, sem recalcular
+# nem reenviar os demais gráficos e cards da página.
 
-        # Verificar se o usuário inseriu um número de OS para pesquisa
-        if os_number:
-            # Filtrar os dados com base na pesquisa do usuário
-            filtered_data = veiculos_data[veiculos_data['summary'].str.contains(os_number, case=False, na=False)]
+@st.fragment
+def secao_busca_os(veiculos):
+    veiculos_data = veiculos.frame
 
-            # Convertendo colunas para o tipo datetime
-            filtered_data['dt_finalizacao'] = pd.to_datetime(filtered_data['dt_finalizacao'], errors='coerce').dt.tz_localize(None)
-            filtered_data['dt_contrato'] = pd.to_datetime(filtered_data['dt_contrato'], errors='coerce').dt.tz_localize(None)
+    # Campo de entrada para o usuário pesquisar pelo número da OS
+    os_number = st.text_input('Digite o número da OS para pesquisa:', '')
 
-            # Adicionar uma coluna indicando se foi finalizado com atraso
-            filtered_data['atrasado'] = filtered_data.apply(lambda row: 'Sim' if row['dt_finalizacao'] > row['dt_contrato'] else 'Não', axis=1)
+    # Verificar se o usuário inseriu um número de OS para pesquisa
+    if os_number:
+        with instrumentation.section('Busca de OS', rows_in=len(veiculos_data)) as secao:
+            # Filtrar os dados com base na pesquisa do usuário (busca no índice de trigramas)
+            with secao.stage('busca'):
+                filtered_data = veiculos_data.iloc[veiculos.index.search(os_number)]
+            secao.rows_out = len(filtered_data)
 
             # Mostrar os resultados em uma tabela interativa
             st.subheader('Resultados da Pesquisa')
-            st.dataframe(filtered_data[['summary', 'marca', 'modelo', 'dt_finalizacao', 'dt_contrato', 'atrasado']])
-        
-        st.divider()
-
-        # 1. Veículos Finalizados por Mês
+            with secao.stage('render'):
+                st.dataframe(filtered_data[['summary', 'marca', 'modelo', 'dt_finalizacao', 'dt_contrato']].assign(
+                    atrasado=(filtered_data['dt_finalizacao'] > filtered_data['dt_contrato']).map({True: 'Sim', False: 'Não'})
+                ))
+
+# 1. Veículos Finalizados por Mês
+@st.fragment
+def secao_veiculos_por_mes(veiculos):
+    with instrumentation.section('1. Veículos Finalizados por Mês') as secao:
         st.subheader('Veículos Finalizados por Mês')
-        veiculos_por_mes = veiculos_data.groupby(veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str)).size().reset_index(name='quantidade')
-        chart_veiculos_mes = alt.Chart(veiculos_por_mes).mark_bar().encode(
-            x=alt.X('dt_finalizacao:N', title='Mês', axis=alt.Axis(labelAngle=0)),  # Define o ângulo das labels do eixo X
+        veiculos_por_mes = secao.aggregate(veiculos.engine.por_mes)
+        meses_no_grafico = resolution.ultimos_meses(veiculos_por_mes)
+        titulo_mes = 'Veículos Finalizados por Mês' if len(meses_no_grafico) == len(veiculos_por_mes) else f'Veículos Finalizados por Mês (últimos {len(meses_no_grafico)} meses)'
+        chart_veiculos_mes = alt.Chart(meses_no_grafico).mark_bar().encode(
+            x=alt.X('mes:N', title='Mês', axis=alt.Axis(labelAngle=0)),  # Define o ângulo das labels do eixo X
             y=alt.Y('quantidade:Q', title='Quantidade'),
-            color=alt.Color('dt_finalizacao:N', title='Mês'),
-            tooltip=['dt_finalizacao', 'quantidade']
+            color=alt.Color('mes:N', title='Mês'),
+            tooltip=['mes', 'quantidade']
         ).properties(
             width=chart_width,
             height=chart_height,
-            title='Veículos Finalizados por Mês'
+            title=titulo_mes
         )
-        st.altair_chart(chart_veiculos_mes, use_container_width=True)
-
-        st.divider()
+        instrumentation.altair_chart(chart_veiculos_mes, use_container_width=True)
 
-        # 2. Selecione o Mês para Veículos Finalizados por Semana
+# 2. Selecione o Mês para Veículos Finalizados por Semana
+@st.fragment
+def secao_veiculos_por_semana(veiculos):
+    with instrumentation.section('2. Veículos Finalizados por Semana') as secao:
         st.subheader('Veículos Finalizados por Semana')
-        mes_selecionado = st.selectbox('Selecione o Mês', veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str).unique(), index=len(veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str).unique()) - 10)
-        
-        # Filtrando os dados pelo mês selecionado
-        veiculos_mes_selecionado = veiculos_data[veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str) == mes_selecionado]
-        veiculos_mes_selecionado['semana'] = veiculos_mes_selecionado['dt_finalizacao'].dt.to_period('W').astype(str)
-        veiculos_mes_selecionado['numero_semana'] = (veiculos_mes_selecionado['dt_finalizacao'].dt.day - 1) // 7 + 1
-        veiculos_mes_selecionado['semana_descricao'] = veiculos_mes_selecionado['numero_semana'].astype(str) + 'ª Semana'
-
-        # Contagem de veículos por semana
-        veiculos_por_semana = veiculos_mes_selecionado.groupby('semana_descricao').size().reset_index(name='quantidade')
-        veiculos_por_semana = veiculos_por_semana.sort_values('semana_descricao')
-
-        chart_veiculos_semana = alt.Chart(veiculos_por_semana).mark_bar().encode(
+        meses_veiculos = veiculos.engine.meses.keys
+        mes_selecionado = st.selectbox('Selecione o Mês', meses_veiculos, index=max(0, len(meses_veiculos) - 10), format_func=preprocess.mes_label)
+    
+        # Filtrando o cubo pelo mês selecionado
+        veiculos_por_semana = secao.aggregate(veiculos.engine.por_semana, mes_selecionado)
+
+        chart_veiculos_semana = alt.Chart(veiculos_por_semana[['semana_descricao', 'quantidade']]).mark_bar().encode(
             x=alt.X('semana_descricao:N', title='Semana', axis=alt.Axis(labelAngle=0)),
             y=alt.Y('quantidade:Q', title='Quantidade'),
             color=alt.Color('semana_descricao:N', title='Semana'),
@@ -156,20 +140,22 @@ else:
         ).properties(
             width=chart_width,
             height=chart_height,
-            title=f'Veículos Finalizados por Semana ({mes_selecionado})'
+            title=f'Veículos Finalizados por Semana ({preprocess.mes_label(mes_selecionado)})'
         )
-        st.altair_chart(chart_veiculos_semana, use_container_width=True)
+        instrumentation.altair_chart(chart_veiculos_semana, use_container_width=True)
 
-        st.divider()
-
-        # 3. Veículos Finalizados por Marca
+# 3. Veículos Finalizados por Marca
+@st.fragment
+def secao_veiculos_por_marca(veiculos):
+    with instrumentation.section('3. Veículos Finalizados por Marca') as secao:
         st.subheader('Veículos Finalizados por Marca')
-        mes_selecionado_marca = st.selectbox('Selecione o Mês para Verificar as Marcas', veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str).unique(),index=len(veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str).unique()) - 10)
-        
-        # Filtrando os dados pelo mês selecionado
-        veiculos_mes_marca = veiculos_data[veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str) == mes_selecionado_marca]
-        veiculos_por_marca = veiculos_mes_marca.groupby('marca').size().reset_index(name='quantidade')
+        meses_veiculos = veiculos.engine.meses.keys
+        mes_selecionado_marca = st.selectbox('Selecione o Mês para Verificar as Marcas', meses_veiculos, index=max(0, len(meses_veiculos) - 10), format_func=preprocess.mes_label)
+    
+        # Filtrando o cubo pelo mês selecionado
+        veiculos_por_marca = secao.aggregate(veiculos.engine.por_marca, mes_selecionado_marca)
         veiculos_por_marca = veiculos_por_marca.sort_values('quantidade', ascending=False)
+        veiculos_por_marca = resolution.limitar_categorias(veiculos_por_marca, 'marca')
 
         chart_veiculos_marca = alt.Chart(veiculos_por_marca).mark_bar().encode(
             x=alt.X('marca:N', title='Marca'),
@@ -179,25 +165,26 @@ else:
         ).properties(
             width=chart_width,
             height=chart_height,
-            title=f'Veículos Finalizados por Marca ({mes_selecionado_marca})'
+            title=f'Veículos Finalizados por Marca ({preprocess.mes_label(mes_selecionado_marca)})'
         )
-        st.altair_chart(chart_veiculos_marca, use_container_width=True)
+        instrumentation.altair_chart(chart_veiculos_marca, use_container_width=True)
 
-        st.divider()
-
-        # 4. Veículos Finalizados por Modelo
+# 4. Veículos Finalizados por Modelo
+@st.fragment
+def secao_veiculos_por_modelo(veiculos, mes_atual):
+    with instrumentation.section('4. Veículos Finalizados por Modelo') as secao:
         st.subheader('Veículos Finalizados por Modelo')
-        meses_disponiveis = veiculos_data['mes'].unique()
-        mes_selecionado_modelo = st.selectbox('Selecione o Mês', meses_disponiveis,index=list(meses_disponiveis).index(mes_atual) if mes_atual in meses_disponiveis else max(0, list(meses_disponiveis).index(sorted(meses_disponiveis)[-1])), key='mes_modelo_selectbox')
-        marca_selecionada = st.selectbox('Selecione a Marca',veiculos_data['marca'].dropna().unique(),  # Remove NaN e obtém valores únicos
+        meses_disponiveis = veiculos.engine.meses.keys
+        mes_selecionado_modelo = st.selectbox('Selecione o Mês', meses_disponiveis,index=indice_mes_atual(meses_disponiveis, mes_atual), key='mes_modelo_selectbox', format_func=preprocess.mes_label)
+        marca_selecionada = st.selectbox('Selecione a Marca', veiculos.marcas,
         key='marca_modelo_selectbox')
-        data_filtrada_modelo = veiculos_data[(veiculos_data['mes'] == mes_selecionado_modelo) & (veiculos_data['marca'] == marca_selecionada)]
+        veiculos_por_modelo = secao.aggregate(veiculos.engine.por_modelo, mes_selecionado_modelo, marca_selecionada)
+        veiculos_por_modelo = resolution.limitar_categorias(veiculos_por_modelo, 'modelo')
+
     
-        
-        if data_filtrada_modelo.empty:
+        if veiculos_por_modelo.empty:
             st.warning("Não há dados disponíveis para a combinação selecionada de mês e marca.")
         else:
-            veiculos_por_modelo = data_filtrada_modelo.groupby('modelo').size().reset_index(name='quantidade')
             chart_veiculos_modelo = alt.Chart(veiculos_por_modelo).mark_bar().encode(
                 x=alt.X('modelo:N', title='Modelo',axis=alt.Axis(labelAngle=0)),
                 y=alt.Y('quantidade:Q', title='Quantidade'),
@@ -206,25 +193,22 @@ else:
             ).properties(
                 width=chart_width,
                 height=chart_height,
-                title=f'Veículos Finalizados por Modelo ({mes_selecionado_modelo} - {marca_selecionada})'
+                title=f'Veículos Finalizados por Modelo ({preprocess.mes_label(mes_selecionado_modelo)} - {marca_selecionada})'
             )
-            st.altair_chart(chart_veiculos_modelo, use_container_width=True)
+            instrumentation.altair_chart(chart_veiculos_modelo, use_container_width=True)
 
-            st.divider()
-
-    elif dashboard == "Termômetro de Prazo":
-        st.title("Termômetro de Prazo")
+        st.divider()
 
-        # 1. Veículos Finalizados - Prazo
+# 1. Veículos Finalizados - Prazo
+@st.fragment
+def secao_prazo_status(veiculos, mes_atual):
+    with instrumentation.section('1. Veículos Finalizados - Prazo') as secao:
         st.subheader('Veículos Finalizados - Prazo')
-        meses_disponiveis = veiculos_data['mes'].unique()
-        mes_selecionado_prazo = st.selectbox('Selecione o Mês', meses_disponiveis,index=list(meses_disponiveis).index(mes_atual) if mes_atual in meses_disponiveis else max(0, list(meses_disponiveis).index(sorted(meses_disponiveis)[-1])), key='mes_prazo_selectbox')
+        meses_disponiveis = veiculos.engine.meses.keys
+        mes_selecionado_prazo = st.selectbox('Selecione o Mês', meses_disponiveis,index=indice_mes_atual(meses_disponiveis, mes_atual), key='mes_prazo_selectbox', format_func=preprocess.mes_label)
         #mes_selecionado_prazo = st.selectbox('Selecione o Mês', veiculos_data['mes'].unique(), index=list(veiculos_data['mes'].unique()).index(mes_atual), key='mes_prazo_selectbox')
-        data_filtrada_prazo = veiculos_data[veiculos_data['mes'] == mes_selecionado_prazo].copy()
-        data_filtrada_prazo['dentro_prazo'] = (data_filtrada_prazo['dt_finalizacao'] <= data_filtrada_prazo['dt_contrato']).fillna(False)
-        prazo_status = data_filtrada_prazo.groupby('dentro_prazo').size().reset_index(name='quantidade')
-        prazo_status['dentro_prazo'] = prazo_status['dentro_prazo'].map({True: 'Dentro do Prazo', False: 'Fora do Prazo'})
-        
+        prazo_status = secao.aggregate(veiculos.engine.prazo_status, mes_selecionado_prazo)
+    
         chart_prazo = alt.Chart(prazo_status).mark_bar().encode(
             x=alt.X('dentro_prazo:N', title='Status do Prazo'),
             y=alt.Y('quantidade:Q', title='Quantidade'),
@@ -234,19 +218,18 @@ else:
             width=chart_width,
             title='Veículos Finalizados Dentro/Fora do Prazo'
         )
-        st.altair_chart(chart_prazo, use_container_width=True)
+        instrumentation.altair_chart(chart_prazo, use_container_width=True)
 
-        st.divider()
-
-         # 2. Prazo por Marca
+# 2. Prazo por Marca
+@st.fragment
+def secao_marca_prazo_status(veiculos, mes_atual):
+    with instrumentation.section('2. Prazo por Marca') as secao:
         st.subheader('Prazo por Marca')
-        meses_disponiveis = veiculos_data['mes'].unique()
-        mes_selecionado_marca_prazo = st.selectbox('Selecione o Mês', meses_disponiveis,index=list(meses_disponiveis).index(mes_atual) if mes_atual in meses_disponiveis else max(0, list(meses_disponiveis).index(sorted(meses_disponiveis)[-1])), key='mes_marca_prazo_selectbox')
+        meses_disponiveis = veiculos.engine.meses.keys
+        mes_selecionado_marca_prazo = st.selectbox('Selecione o Mês', meses_disponiveis,index=indice_mes_atual(meses_disponiveis, mes_atual), key='mes_marca_prazo_selectbox', format_func=preprocess.mes_label)
         #mes_selecionado_marca_prazo = st.selectbox('Selecione o Mês', veiculos_data['mes'].unique(), index=list(veiculos_data['mes'].unique()).index(mes_atual), key='mes_marca_prazo_selectbox')
-        data_filtrada_marca_prazo = veiculos_data[veiculos_data['mes'] == mes_selecionado_marca_prazo].copy()
-        data_filtrada_marca_prazo['dentro_prazo'] = (data_filtrada_marca_prazo['dt_finalizacao'] <= data_filtrada_marca_prazo['dt_contrato']).fillna(False)
-        marca_prazo_status = data_filtrada_marca_prazo.groupby(['marca', 'dentro_prazo']).size().reset_index(name='quantidade')
-        marca_prazo_status['dentro_prazo'] = marca_prazo_status['dentro_prazo'].map({True: 'Dentro do Prazo', False: 'Fora do Prazo'})
+        marca_prazo_status = secao.aggregate(veiculos.engine.marca_prazo_status, mes_selecionado_marca_prazo)
+        marca_prazo_status = resolution.limitar_categorias(marca_prazo_status, 'marca')
         chart_marca_prazo = alt.Chart(marca_prazo_status).mark_bar().encode(
             x=alt.X('marca:N', title='Marca', axis=alt.Axis(labelAngle=90)),  # Legenda do eixo x na vertical
             y=alt.Y('quantidade:Q', title='Quantidade'),
@@ -256,24 +239,21 @@ else:
             width=chart_width,
             title='Prazo por Marca'
         )
-        st.altair_chart(chart_marca_prazo, use_container_width=True)
-
-        st.divider()
+        instrumentation.altair_chart(chart_marca_prazo, use_container_width=True)
 
-        # 3. Mapa de Calor
+# 3. Mapa de Calor
+@st.fragment
+def secao_mapa_calor(veiculos, mes_atual):
+    with instrumentation.section('3. Mapa de Calor') as secao:
         st.subheader('Mapa de Calor')
-        meses_disponiveis = veiculos_data['mes'].unique()
-        mes_selecionado_mapa_calor = st.selectbox('Selecione o Mês', meses_disponiveis,index=list(meses_disponiveis).index(mes_atual) if mes_atual in meses_disponiveis else max(0, list(meses_disponiveis).index(sorted(meses_disponiveis)[-1])))
+        meses_disponiveis = veiculos.engine.meses.keys
+        mes_selecionado_mapa_calor = st.selectbox('Selecione o Mês', meses_disponiveis,index=indice_mes_atual(meses_disponiveis, mes_atual), format_func=preprocess.mes_label)
         #mes_selecionado_mapa_calor = st.selectbox('Selecione o Mês', veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str).unique(),index=len(veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str).unique()) - 9)
-        
-        # Filtrando os dados pelo mês selecionado
-        veiculos_mes_mapa_calor = veiculos_data[veiculos_data['dt_finalizacao'].dt.to_period('M').astype(str) == mes_selecionado_mapa_calor]
-        veiculos_mes_mapa_calor['dia'] = veiculos_mes_mapa_calor['dt_finalizacao'].dt.day
-        veiculos_mes_mapa_calor['no_prazo'] = veiculos_mes_mapa_calor['dt_finalizacao'] <= veiculos_mes_mapa_calor['dt_contrato']
-        veiculos_mapa_calor = veiculos_mes_mapa_calor.groupby(['dia', 'no_prazo']).size().reset_index(name='quantidade')
-        veiculos_mapa_calor['Prazo'] = veiculos_mapa_calor['no_prazo'].map({True: 'Dentro do Prazo', False: 'Fora do Prazo'})
-
-        chart_mapa_calor = alt.Chart(veiculos_mapa_calor).mark_rect().encode(
+    
+        # Filtrando o cubo pelo mês selecionado
+        veiculos_mapa_calor = secao.aggregate(veiculos.engine.mapa_calor, mes_selecionado_mapa_calor)
+
+        chart_mapa_calor = alt.Chart(veiculos_mapa_calor[['dia', 'Prazo', 'quantidade']]).mark_rect().encode(
             x=alt.X('dia:O', title='Dia'),
             y=alt.Y('Prazo:N', title='Prazo'),
             color=alt.Color('quantidade:Q', title='Quantidade'),
@@ -281,26 +261,150 @@ else:
         ).properties(
             width=chart_width,
             height=chart_height,
-            title=f'Mapa de Calor ({mes_selecionado_mapa_calor})'
+            title=f'Mapa de Calor ({preprocess.mes_label(mes_selecionado_mapa_calor)})'
         )
-        st.altair_chart(chart_mapa_calor, use_container_width=True)
+        instrumentation.altair_chart(chart_mapa_calor, use_container_width=True)
 
-    elif dashboard == "Kits Faturados":
-        st.title("Kits Faturados")
+# 1. Selecione o Mês para Kits Faturados por Mês
+@st.fragment
+def secao_kits_por_mes(kits):
+    with instrumentation.section('1. Kits Faturados por Mês') as secao:
+        st.subheader('Kits Faturados por Mês')
+        mes_selecionado = st.selectbox('Selecione o ano', kits.engine.anos.keys)
+
+        # Contagem de kits por mês no ano selecionado
+        kits_por_mes = secao.aggregate(kits.engine.por_mes, mes_selecionado)
+
+        # Criando o gráfico
+        chart_kits_mes = alt.Chart(kits_por_mes).mark_bar().encode(
+            x=alt.X('mes:N', title='Mês', axis=alt.Axis(labelAngle=0)),
+            y=alt.Y('quantidade:Q', title='Quantidade'),
+            color=alt.Color('mes:N', title='Mês'),
+            tooltip=['mes', 'quantidade']
+        ).properties(
+          width=chart_width,
+          height=chart_height,
+          title=f'Kits Faturados por Mês ({mes_selecionado})'
+        )
+
+        instrumentation.altair_chart(chart_kits_mes, use_container_width=True) 
 
-        # 1. Kits Terminados - Atual
-        kits_terminados_atual = kits_data[kits_data['mes'] == mes_atual]['key'].nunique()
+# 2. Selecione o Mês para Veículos Finalizados por Semana
+@st.fragment
+def secao_kits_por_semana(kits):
+    with instrumentation.section('2. Kits Finalizados por Semana') as secao:
+        st.subheader('Kits Finalizados por Semana')
+        mes_selecionado = st.selectbox('Selecione o Mês', kits.engine.meses.keys, format_func=preprocess.mes_label)
+    
+        # Contagem de kits por semana no mês selecionado
+        veiculos_por_semana = secao.aggregate(kits.engine.por_semana, mes_selecionado)
 
-        # 2. Kits Faturados - D-1
-        dia_anterior = (datetime.now() - pd.Timedelta(days=1)).date()
-        kits_faturados_d1 = kits_data[kits_data['dia'] == dia_anterior]['key'].nunique()
+        chart_veiculos_semana = alt.Chart(veiculos_por_semana[['semana_descricao', 'quantidade']]).mark_bar().encode(
+            x=alt.X('semana_descricao:N', title='Semana', axis=alt.Axis(labelAngle=0)),
+            y=alt.Y('quantidade:Q', title='Quantidade'),
+            color=alt.Color('semana_descricao:N', title='Semana'),
+            tooltip=['semana_descricao', 'quantidade']
+        ).properties(
+            width=chart_width,
+            height=chart_height,
+            title=f'Kits Finalizados por Semana ({preprocess.mes_label(mes_selecionado)})'
+        )
+        instrumentation.altair_chart(chart_veiculos_semana, use_container_width=True)
 
-        # 3. Kits Faturados - Semana Atual
-        semana_atual = kits_data[kits_data['dt_faturado'].dt.isocalendar().week == datetime.now().isocalendar()[1]]
-        kits_faturados_semana_atual = semana_atual['key'].nunique()
+# 3. Kits Finalizados por Dia
+@st.fragment
+def secao_kits_por_dia(kits):
+    with instrumentation.section('3. Kits Finalizados por Dia') as secao:
+        st.subheader('Kits Finalizados por Dia')
 
-        # 4. Kits Faturados - Mês Atual
-        kits_faturados_mes_atual = kits_data[kits_data['mes'] == mes_atual]['key'].nunique()
+        # Primeiro e último dia com dados, das fronteiras já calculadas pelo motor
+        primeiro_dia = pd.Timestamp(kits.engine.dias.keys[0])
+        ultimo_dia = pd.Timestamp(kits.engine.dias.keys[-1])
+
+        # Seletor de período
+        data_inicial, data_final = st.date_input(
+           "Selecione o período",
+           [primeiro_dia, ultimo_dia],
+           min_value=primeiro_dia,
+           max_value=ultimo_dia
+        )
+
+        # Verificar se a seleção é válida (evita erro quando o usuário não seleciona um intervalo válido)
+        if data_inicial and data_final and data_inicial <= data_final:
+           # Contagem de kits por dia no período selecionado
+           veiculos_por_dia = secao.aggregate(kits.engine.por_dia, data_inicial, data_final)
+           # Períodos longos viram pontos semanais ou mensais (limite em config.CHART_MAX_POINTS)
+           veiculos_por_dia, granularidade = resolution.por_periodo(veiculos_por_dia, 'dt_faturado')
+
+           # Criação do gráfico com Altair (gráfico de linha)
+           chart_veiculos_dia = alt.Chart(veiculos_por_dia).mark_line(point=True).encode(
+              x=alt.X('dt_faturado:T', title=granularidade),
+              y=alt.Y('quantidade:Q', title='Quantidade'),
+              tooltip=['dt_faturado', 'quantidade']
+            ).properties(
+             width=chart_width,
+             height=chart_height,
+             title=f'Kits Finalizados por {granularidade} ({data_inicial} a {data_final})'
+            )
+
+           # Exibição do gráfico no Streamlit
+           instrumentation.altair_chart(chart_veiculos_dia, use_container_width=True)
+           st.caption(f"Kits distintos no período: {kits.engine.distintos(data_inicial, data_final)}")
+        else:
+           st.warning("Selecione um intervalo válido.")
+
+# Verificar autenticação
+if 'authenticated' not in st.session_state:
+    st.session_state.authenticated = False
+
+if not st.session_state.authenticated:
+    show_login()
+else:
+    mes_atual = preprocess.current_period_code(datetime.now())
+
+    # Configurações dos dashboards
+    st.sidebar.title(f"Bem-vindo, {st.session_state.username.split('.')[0].capitalize()}")
+    dashboard = st.sidebar.selectbox("Selecione o Dashboard", ["Veículos Finalizados", "Termômetro de Prazo", "Kits Faturados"])
+    instrumentation.begin_run(dashboard)
+    st.logo("logo.png")
+
+    # Só os dados do dashboard escolhido são esperados; o outro conjunto é pré-carregado em segundo plano
+    dataset = load_dataset(datasets.DASHBOARD_DATASETS[dashboard])
+
+    if dashboard == "Veículos Finalizados":
+        st.title("Veículos Finalizados")
+        veiculos = dataset
+
+        secao_busca_os(veiculos)
+        st.divider()
+        secao_veiculos_por_mes(veiculos)
+        st.divider()
+        secao_veiculos_por_semana(veiculos)
+        st.divider()
+        secao_veiculos_por_marca(veiculos)
+        st.divider()
+        secao_veiculos_por_modelo(veiculos, mes_atual)
+
+    elif dashboard == "Termômetro de Prazo":
+        st.title("Termômetro de Prazo")
+        veiculos = dataset
+
+        secao_prazo_status(veiculos, mes_atual)
+        st.divider()
+        secao_marca_prazo_status(veiculos, mes_atual)
+        st.divider()
+        secao_mapa_calor(veiculos, mes_atual)
+
+    elif dashboard == "Kits Faturados":
+        st.title("Kits Faturados")
+        kits = dataset
+
+        # Cards: kits distintos faturados em D-1, na semana atual e no mês atual
+        with instrumentation.section('Cards') as secao:
+            cards = secao.aggregate(kits.engine.cards, datetime.now())
+            kits_faturados_d1 = cards['d1']
+            kits_faturados_semana_atual = cards['semana']
+            kits_faturados_mes_atual = cards['mes']
 
         # Exibição dos cards lado a lado
         col1, col2, col3 = st.columns(3)
@@ -358,97 +462,14 @@ else:
         """, unsafe_allow_html=True)
          
          st.divider()
-         
-        # 1. Selecione o Mês para Kits Faturados por Mês
-        st.subheader('Kits Faturados por Mês')
-        mes_selecionado = st.selectbox('Selecione o ano', kits_data['dt_faturado'].dt.to_period('a').astype(str).unique())
-
-        # Filtrando os dados pelo mês selecionado
-        kits_mes_selecionado = kits_data[kits_data['dt_faturado'].dt.to_period('a').astype(str) == mes_selecionado]
-
-        # Contagem de kits por mês
-        kits_por_mes = kits_mes_selecionado.groupby(kits_mes_selecionado['dt_faturado'].dt.to_period('M')).size().reset_index(name='quantidade')
-        kits_por_mes = kits_por_mes.rename(columns={'dt_faturado': 'mes'})
-        kits_por_mes['mes'] = kits_por_mes['mes'].astype(str)
-
-        # Criando o gráfico
-        chart_kits_mes = alt.Chart(kits_por_mes).mark_bar().encode(
-            x=alt.X('mes:N', title='Mês', axis=alt.Axis(labelAngle=0)),
-            y=alt.Y('quantidade:Q', title='Quantidade'),
-            color=alt.Color('mes:N', title='Mês'),
-            tooltip=['mes', 'quantidade']
-        ).properties(
-          width=chart_width,
-          height=chart_height,
-          title=f'Kits Faturados por Mês ({mes_selecionado})'
-        )
-
-        st.altair_chart(chart_kits_mes, use_container_width=True) 
 
+        secao_kits_por_mes(kits)
         st.divider()
-
-        # 2. Selecione o Mês para Veículos Finalizados por Semana
-        st.subheader('Kits Finalizados por Semana')
-        mes_selecionado = st.selectbox('Selecione o Mês', kits_data['dt_faturado'].dt.to_period('M').astype(str).unique())
-        
-        # Filtrando os dados pelo mês selecionado
-        veiculos_mes_selecionado = kits_data[kits_data['dt_faturado'].dt.to_period('M').astype(str) == mes_selecionado]
-        veiculos_mes_selecionado['semana'] = veiculos_mes_selecionado['dt_faturado'].dt.to_period('W').astype(str)
-        veiculos_mes_selecionado['numero_semana'] = (veiculos_mes_selecionado['dt_faturado'].dt.day - 1) // 7 + 1
-        veiculos_mes_selecionado['semana_descricao'] = veiculos_mes_selecionado['numero_semana'].astype(str) + 'ª Semana'
-
-        # Contagem de veículos por semana
-        veiculos_por_semana = veiculos_mes_selecionado.groupby('semana_descricao').size().reset_index(name='quantidade')
-        veiculos_por_semana = veiculos_por_semana.sort_values('semana_descricao')
-
-        chart_veiculos_semana = alt.Chart(veiculos_por_semana).mark_bar().encode(
-            x=alt.X('semana_descricao:N', title='Semana', axis=alt.Axis(labelAngle=0)),
-            y=alt.Y('quantidade:Q', title='Quantidade'),
-            color=alt.Color('semana_descricao:N', title='Semana'),
-            tooltip=['semana_descricao', 'quantidade']
-        ).properties(
-            width=chart_width,
-            height=chart_height,
-            title=f'Kits Finalizados por Semana ({mes_selecionado})'
-        )
-        st.altair_chart(chart_veiculos_semana, use_container_width=True)
-
+        secao_kits_por_semana(kits)
         st.divider()
+        secao_kits_por_dia(kits)
 
-        st.subheader('Kits Finalizados por Dia')
-
-        # Filtrar apenas os dias que têm dados disponíveis
-        dias_disponiveis = kits_data['dt_faturado'].unique()
-
-        # Seletor de período
-        data_inicial, data_final = st.date_input(
-           "Selecione o período",
-           [dias_disponiveis.min(), dias_disponiveis.max()],
-           min_value=dias_disponiveis.min(),
-           max_value=dias_disponiveis.max()
-        )
-
-        # Verificar se a seleção é válida (evita erro quando o usuário não seleciona um intervalo válido)
-        if data_inicial and data_final and data_inicial <= data_final:
-           # Filtrando os dados pelo período selecionado
-           veiculos_periodo_selecionado = kits_data[(kits_data['dt_faturado'] >= pd.to_datetime(data_inicial)) & (kits_data['dt_faturado'] <= pd.to_datetime(data_final))]
-
-           # Contagem de veículos por dia
-           veiculos_por_dia = veiculos_periodo_selecionado.groupby(veiculos_periodo_selecionado['dt_faturado'].dt.date).size().reset_index(name='quantidade')
-           veiculos_por_dia = veiculos_por_dia.sort_values('dt_faturado')
-
-           # Criação do gráfico com Altair (gráfico de linha)
-           chart_veiculos_dia = alt.Chart(veiculos_por_dia).mark_line(point=True).encode(
-              x=alt.X('dt_faturado:T', title='Dia'),
-              y=alt.Y('quantidade:Q', title='Quantidade'),
-              tooltip=['dt_faturado', 'quantidade']
-            ).properties(
-             width=chart_width,
-             height=chart_height,
-             title=f'Kits Finalizados por Dia ({data_inicial} a {data_final})'
-            )
-
-           # Exibição do gráfico no Streamlit
-           st.altair_chart(chart_veiculos_dia, use_container_width=True)
-        else:
-           st.warning("Selecione um intervalo válido.")
\ No newline at end of file
+    # Painel de desempenho (administradores) e log estruturado do rerun
+    if instrumentation.is_admin(st.session_state.username):
+        instrumentation.show_panel(instrumentation.current_run(), refresher.snapshots())
+    instrumentation.end_run()
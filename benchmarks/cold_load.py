@@ -0,0 +1,57 @@
+# Benchmark da carga a frio dos dois conjuntos de dados (consulta, pré-processamento e
+# estruturas derivadas), com um ou mais workers de carga. Usa a fonte local ou duckdb
+# sobre um diretório gerado por benchmarks.generate, com uma latência artificial por
+# consulta no lugar da espera do Athena, e um diretório de snapshots vazio a cada rodada.
+#
+# Uso: python -m benchmarks.cold_load --data data --source duckdb --latency 5 --workers 1 2
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import config
+import datasets
+import refresh
+import sources
+
+
+def cold_load(workers):
+    with tempfile.TemporaryDirectory() as snapshots:
+        config.SNAPSHOT_DIR = snapshots
+        refresher = refresh.Refresher(datasets.BUILDERS, config.REFRESH_INTERVAL, workers).start()
+        start = time.perf_counter()
+        for name in datasets.BUILDERS:
+            refresher.prefetch(name)
+        loaded = [refresher.get(name) for name in datasets.BUILDERS]
+        seconds = time.perf_counter() - start
+        refresher.stop()
+    if any(dataset is None for dataset in loaded):
+        raise RuntimeError("Falha na carga; veja o log")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de carga a frio dos conjuntos de dados.")
+    parser.add_argument("--data", default=config.LOCAL_DATA_DIR, help="diretório gerado por benchmarks.generate")
+    parser.add_argument("--source", default="duckdb", choices=["local", "duckdb"])
+    parser.add_argument("--latency", type=float, default=5.0, help="segundos de espera por consulta")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="workers de carga medidos")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    pd.set_option("mode.copy_on_write", True)
+
+    config.LOCAL_DATA_DIR = os.path.abspath(args.data)
+    config.SOURCE_LATENCY = args.latency
+    config.SHARED_DIR = None
+    sources._source = sources.create_source(args.source)
+
+    for workers in args.workers:
+        times = sorted(cold_load(workers) for _ in range(args.repeat))
+        print(f"{args.source:<7} latência {args.latency:5.1f} s  workers {workers}  "
+              f"mediana {times[len(times) // 2]:8.2f} s  mínimo {times[0]:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Gerador de dados sintéticos com as mesmas colunas de vw_veiculos_finalizados e
+# vw_vidros_kits, para medir o dashboard sem acesso ao Athena.
+#
+# Uso: python -m benchmarks.generate --rows 1000000 --output data
+# (o diretório gerado serve para DASH_DATA_SOURCE=local ou duckdb)
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+START = pd.Timestamp("2019-01-01")
+END = pd.Timestamp("2025-12-31")
+N_MARCAS = 40
+MODELOS_POR_MARCA = 25
+
+
+# Índices em [0, n) com distribuição de Zipf (poucos valores concentram a maioria das linhas)
+def _zipf_choice(rng, n, size, exponent=1.2):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return rng.choice(n, size=size, p=weights / weights.sum())
+
+
+# Datas ao longo de vários anos, com volume crescente no tempo
+def _dates(rng, size, start=START, end=END):
+    span = (end - start).total_seconds()
+    offsets = np.sqrt(rng.random(size)) * span
+    return start + pd.to_timedelta(offsets.astype("int64"), unit="s")
+
+
+def generate_veiculos(rows, seed=0, start=START, end=END):
+    rng = np.random.default_rng(seed)
+    marca_idx = _zipf_choice(rng, N_MARCAS, rows)
+    modelo_idx = _zipf_choice(rng, MODELOS_POR_MARCA, rows)
+    marcas = pd.Series([f"MARCA {i:02d}" for i in range(N_MARCAS)])[marca_idx].reset_index(drop=True)
+    modelos = marcas + " MODELO " + pd.Series(modelo_idx).astype(str)
+
+    dt_finalizacao = _dates(rng, rows, start, end)
+    # Prazo contratual em torno da finalização, com uma parte dos contratos sem data
+    atraso = pd.to_timedelta(rng.normal(-2, 5, rows).round(), unit="D")
+    dt_contrato = pd.Series(dt_finalizacao + atraso).mask(rng.random(rows) < 0.02)
+
+    os_numbers = pd.Series(rng.permutation(rows) + 100_000).astype(str)
+    return pd.DataFrame({
+        "summary": "OS " + os_numbers + " - " + modelos + " - Troca de vidro",
+        "marca": marcas,
+        "modelo": modelos,
+        "dt_finalizacao": dt_finalizacao,
+        "dt_contrato": dt_contrato,
+    })
+
+
+# Kits: cerca de 1,3 linha por chave, como na view original
+def generate_kits(rows, seed=0, start=START, end=END):
+    rng = np.random.default_rng(seed + 1)
+    keys = rng.integers(0, max(int(rows / 1.3), 1), rows)
+    return pd.DataFrame({
+        "key": "KIT-" + pd.Series(keys).astype(str),
+        "dt_faturado": _dates(rng, rows, start, end),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera extrações sintéticas das views do dashboard.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="linhas por view")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="data", help="diretório de saída dos arquivos Parquet")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    generate_veiculos(args.rows, args.seed).to_parquet(os.path.join(args.output, "vw_veiculos_finalizados.parquet"), index=False)
+    generate_kits(args.rows, args.seed).to_parquet(os.path.join(args.output, "vw_vidros_kits.parquet"), index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Benchmark das etapas de cada dashboard sobre dados sintéticos de tamanhos crescentes.
+# Mede separadamente o pré-processamento, a construção das estruturas derivadas, a
+# agregação de cada gráfico, a busca de OS e os cards, e grava os tempos em JSON
+# para comparar versões.
+#
+# Uso: python -m benchmarks.run --sizes 10000 1000000 10000000 --output benchmarks/results.json
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import cube
+import engine
+import kpi
+import preprocess
+import search
+from benchmarks import generate
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+
+
+def measure(fn, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+    }
+
+
+def _rows_out(result):
+    if isinstance(result, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(result)
+    if isinstance(result, (search.SubstringIndex, kpi.DistinctKeyIndex)):
+        return len(result)
+    return None
+
+
+def run_size(rows, repeat, seed, engine_kind="pandas"):
+    results = []
+
+    def stage(dashboard, name, fn, rows_in, stage_repeat=repeat):
+        result, seconds = measure(fn, stage_repeat)
+        results.append({
+            "rows": rows,
+            "engine": engine_kind,
+            "dashboard": dashboard,
+            "stage": name,
+            "rows_in": rows_in,
+            "rows_out": _rows_out(result),
+            "seconds": seconds,
+        })
+        return result
+
+    raw_veiculos = generate.generate_veiculos(rows, seed)
+    raw_kits = generate.generate_kits(rows, seed)
+
+    # Etapas executadas uma vez por carga dos dados
+    veiculos = stage("Carga", "veiculos.preprocess", lambda: preprocess.prepare_veiculos(raw_veiculos), rows)
+    veiculos_cube = stage("Carga", "veiculos.cube", lambda: cube.build_veiculos_cube(veiculos), len(veiculos))
+    index = stage("Carga", "veiculos.search_index", lambda: search.SubstringIndex(veiculos["summary"]), len(veiculos), 1)
+    kits = stage("Carga", "kits.preprocess", lambda: preprocess.prepare_kits(raw_kits), rows)
+    kits_cube = stage("Carga", "kits.cube", lambda: cube.build_kits_cube(kits), len(kits))
+    veiculos_engine = stage("Carga", "veiculos.engine", lambda: engine.veiculos_engine(veiculos, veiculos_cube, engine_kind), len(veiculos), 1)
+    kpi_index = stage("Carga", "kits.kpi", lambda: kpi.DistinctKeyIndex(kits["dt_faturado"], kits["key"]), len(kits))
+    kits_engine = stage("Carga", "kits.engine", lambda: engine.kits_engine(kits, kits_cube, kpi_index, engine_kind), len(kits), 1)
+
+    mes = int(veiculos_cube["mes"].max())
+    marca = veiculos["marca"].value_counts().index[0]
+    os_number = veiculos["summary"].iloc[len(veiculos) // 2].split()[1]
+
+    dashboard = "Veículos Finalizados"
+    for query in (os_number[:2], os_number[:4], os_number):
+        stage(dashboard, f"busca_os[{len(query)}]", lambda: index.search(query), len(veiculos))
+    stage(dashboard, "1. Veículos Finalizados por Mês", veiculos_engine.por_mes, veiculos_engine.rows)
+    stage(dashboard, "2. Veículos Finalizados por Semana", lambda: veiculos_engine.por_semana(mes), veiculos_engine.rows)
+    stage(dashboard, "3. Veículos Finalizados por Marca", lambda: veiculos_engine.por_marca(mes), veiculos_engine.rows)
+    stage(dashboard, "4. Veículos Finalizados por Modelo", lambda: veiculos_engine.por_modelo(mes, marca), veiculos_engine.rows)
+
+    dashboard = "Termômetro de Prazo"
+    stage(dashboard, "1. Veículos Finalizados - Prazo", lambda: veiculos_engine.prazo_status(mes), veiculos_engine.rows)
+    stage(dashboard, "2. Prazo por Marca", lambda: veiculos_engine.marca_prazo_status(mes), veiculos_engine.rows)
+    stage(dashboard, "3. Mapa de Calor", lambda: veiculos_engine.mapa_calor(mes), veiculos_engine.rows)
+
+    dashboard = "Kits Faturados"
+    now = kits["dt_faturado"].max().to_pydatetime()
+    ano = int(kits_cube["ano"].max())
+    mes_kits = int(kits_cube["mes"].max())
+    inicio, fim = kits_cube["data"].min(), kits_cube["data"].max()
+    stage(dashboard, "cards", lambda: kits_engine.cards(now), len(kits))
+    stage(dashboard, "1. Kits Faturados por Mês", lambda: kits_engine.por_mes(ano), kits_engine.rows)
+    stage(dashboard, "2. Kits Finalizados por Semana", lambda: kits_engine.por_semana(mes_kits), kits_engine.rows)
+    stage(dashboard, "3. Kits Finalizados por Dia", lambda: kits_engine.por_dia(inicio, fim), kits_engine.rows)
+    stage(dashboard, "kits distintos no período", lambda: kits_engine.distintos(inicio, fim), len(kpi_index))
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das etapas dos dashboards com dados sintéticos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="linhas por view em cada rodada")
+    parser.add_argument("--repeat", type=int, default=5, help="repetições de cada etapa")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", nargs="+", default=["pandas"], choices=sorted(engine.ENGINES), help="motores de agregação medidos")
+    parser.add_argument("--output", default="benchmarks/results.json", help="arquivo JSON de saída")
+    args = parser.parse_args()
+    # Mesmo modo do app: recortes não copiam os frames
+    pd.set_option("mode.copy_on_write", True)
+
+    results = []
+    for rows in args.sizes:
+        for engine_kind in args.engine:
+            size_results = run_size(rows, args.repeat, args.seed, engine_kind)
+            for r in size_results:
+                print(f"{rows:>10} {engine_kind:<7} {r['dashboard']:<22} {r['stage']:<40} {r['seconds']['median'] * 1000:10.2f} ms")
+            results.extend(size_results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+
+# Configurações da carga de dados (podem ser sobrescritas por variáveis de ambiente)
+
+# Fonte dos dados: "athena" (produção), "local" (diretório com Parquet/CSV) ou "duckdb"
+DATA_SOURCE = os.environ.get("DASH_DATA_SOURCE", "athena")
+ATHENA_DATABASE = os.environ.get("DASH_ATHENA_DATABASE", "jira_sbm")
+
+# Diretório com um arquivo '<view>.parquet' ou '<view>.csv' por view (fontes local e duckdb)
+LOCAL_DATA_DIR = os.environ.get("DASH_LOCAL_DATA_DIR", "data")
+
+# Banco DuckDB usado pela fonte "duckdb" (em memória por padrão)
+DUCKDB_DATABASE = os.environ.get("DASH_DUCKDB_DATABASE", ":memory:")
+
+# Leitura do Athena: o resultado é gravado em Parquet pelo próprio Athena (CTAS por padrão,
+# ou UNLOAD, que exige ATHENA_S3_OUTPUT) e lido em lotes
+ATHENA_UNLOAD = os.environ.get("DASH_ATHENA_UNLOAD", "0") == "1"
+ATHENA_S3_OUTPUT = os.environ.get("DASH_ATHENA_S3_OUTPUT")
+ATHENA_WORKGROUP = os.environ.get("DASH_ATHENA_WORKGROUP", "primary")
+# Reaproveita o resultado de uma consulta idêntica feita há menos de N segundos, mesmo
+# que a view tenha mudado nesse meio tempo (0, o padrão, desliga)
+ATHENA_CACHE_SECONDS = int(os.environ.get("DASH_ATHENA_CACHE_SECONDS", "0"))
+# Linhas por lote na leitura e conversão dos resultados
+FETCH_CHUNK_ROWS = int(os.environ.get("DASH_FETCH_CHUNK_ROWS", "500000"))
+# Latência artificial (em segundos) por consulta nas fontes local e duckdb, para medir a
+# carga a frio como se as consultas fossem ao Athena
+SOURCE_LATENCY = float(os.environ.get("DASH_SOURCE_LATENCY", "0"))
+
+# Motor das agregações dos gráficos: "pandas" (recorta os cubos) ou "duckdb" (SQL sobre Arrow)
+AGGREGATION_ENGINE = os.environ.get("DASH_AGGREGATION_ENGINE", "pandas")
+
+# Diretório onde ficam os snapshots Parquet locais de cada view
+SNAPSHOT_DIR = os.environ.get("DASH_SNAPSHOT_DIR", ".snapshots")
+
+# Janela (em dias) antes do último registro visto que é sempre rebuscada,
+# para capturar edições tardias
+LOOKBACK_DAYS = int(os.environ.get("DASH_LOOKBACK_DAYS", "7"))
+
+# Views consultadas: coluna de data usada como marca d'água e, opcionalmente, chave de
+# deduplicação ("key_column"). Sem chave, a carga incremental só substitui a janela
+# rebuscada; os kits podem ter várias linhas por chave, e a chave dos veículos não faz
+# parte do schema confirmado da view.
+VIEWS = {
+    "vw_veiculos_finalizados": {"date_column": "dt_finalizacao"},
+    "vw_vidros_kits": {"date_column": "dt_faturado"},
+}
+
+# Intervalo (em segundos) entre atualizações em segundo plano dos dados
+REFRESH_INTERVAL = int(os.environ.get("DASH_REFRESH_INTERVAL", "900"))
+# Conjuntos de dados carregados ao mesmo tempo (as consultas das views correm em paralelo)
+LOAD_WORKERS = int(os.environ.get("DASH_LOAD_WORKERS", "2"))
+
+# Diretório compartilhado entre réplicas do app. Quando definido, só um processo (o que
+# obtém o lock) consulta a fonte e publica os frames pré-processados como Arrow IPC; os
+# demais mapeiam esses arquivos em memória, sem cópia.
+SHARED_DIR = os.environ.get("DASH_SHARED_DIR")
+# Tempo máximo (em segundos) que uma réplica espera pela primeira publicação
+SHARED_WAIT = int(os.environ.get("DASH_SHARED_WAIT", "600"))
+
+# Resolução dos gráficos: máximo de pontos da linha diária (acima disso, agrupa por
+# semana ou mês) e de categorias por eixo (as menores viram "Outras")
+CHART_MAX_POINTS = int(os.environ.get("DASH_CHART_MAX_POINTS", "400"))
+CHART_MAX_CATEGORIES = int(os.environ.get("DASH_CHART_MAX_CATEGORIES", "25"))
+
+# Instrumentação dos reruns: tempos por seção, logs estruturados e painel para administradores
+INSTRUMENTATION = os.environ.get("DASH_INSTRUMENTATION", "0") == "1"
+# Arquivo opcional que recebe os logs estruturados além do stderr (uma linha JSON por rerun)
+INSTRUMENTATION_LOG = os.environ.get("DASH_INSTRUMENTATION_LOG")
+# Quantidade de medições recentes por seção usadas nos percentis
+INSTRUMENTATION_HISTORY = int(os.environ.get("DASH_INSTRUMENTATION_HISTORY", "500"))
+# A cada quantos reruns o resumo p50/p95 é gravado no log
+INSTRUMENTATION_SUMMARY_EVERY = int(os.environ.get("DASH_INSTRUMENTATION_SUMMARY_EVERY", "50"))
+# Usuários que veem o painel de desempenho (separados por vírgula)
+ADMIN_USERS = {u.strip() for u in os.environ.get("DASH_ADMIN_USERS", "").split(",") if u.strip()}
@@ -0,0 +1,18 @@
+VEICULOS_DIMS = ["mes", "semana", "dia", "marca", "modelo", "dentro_prazo"]
+KITS_DIMS = ["ano", "mes", "semana", "data"]
+
+
+# Cubo de veículos: quantidade por (mês, semana do mês, dia, marca, modelo, dentro do prazo)
+def build_veiculos_cube(data):
+    return data.groupby(VEICULOS_DIMS, dropna=False, observed=True).size().reset_index(name="quantidade")
+
+
+# Cubo de kits: quantidade de linhas por dia (com mês, ano e semana do mês). Os kits
+# distintos vêm do kpi.DistinctKeyIndex, que une dias sem contar a mesma chave duas vezes.
+def build_kits_cube(kits_data):
+    return kits_data.groupby(KITS_DIMS, observed=True).size().reset_index(name="quantidade")
+
+
+# Soma a quantidade do cubo (já recortado) pelas dimensões pedidas
+def rollup(cube, dims, value="quantidade"):
+    return cube.groupby(dims, dropna=False, observed=True)[value].sum().reset_index()
@@ -0,0 +1,126 @@
+from collections import namedtuple
+from datetime import datetime
+
+import config
+import cube
+import engine
+import incremental
+import instrumentation
+import kpi
+import preprocess
+import queries
+import search
+import shared
+
+# Versão carregada de um conjunto de dados com todas as estruturas derivadas.
+# Um Dataset nunca é alterado depois de construído; a atualização cria outro.
+# 'marcas' são as opções do seletor de marca, tiradas uma vez das categorias do frame.
+# 'version' identifica a versão publicada em config.SHARED_DIR de onde o frame veio.
+Dataset = namedtuple(
+    "Dataset",
+    ["frame", "cube", "engine", "index", "kpi", "marcas", "loaded_at", "version"],
+    defaults=[None, None, None, None, None],
+)
+
+# Último Dataset construído de cada versão publicada, para não reconstruir sem novidade
+_latest = {}
+
+
+# Executa uma etapa da carga como seção instrumentada ("carga.<dataset>.<etapa>")
+def _step(name, fn, *args):
+    with instrumentation.section(f"carga.{name}") as secao:
+        return secao.aggregate(fn, *args)
+
+
+# Frame pré-processado e estruturas derivadas. Com config.SHARED_DIR, só o processo
+# publicador consulta a fonte e constrói os cubos e índices; todos usam o frame e as
+# partes publicados, mapeados em memória, e só montam os objetos em volta deles.
+def _build(name, load, derive):
+    if not config.SHARED_DIR:
+        return derive(load())
+    if shared.is_publisher():
+        frame = load()
+        _step(f"{name}.publicacao", shared.publish, name, frame, _parts(derive(frame)))
+    version = shared.wait_version(name)
+    latest = _latest.get(name)
+    if latest is not None and latest.version == version:
+        return latest
+    frame, parts = _step(f"{name}.mmap", shared.read, name, version)
+    _latest[name] = derive(frame, parts)._replace(version=version)
+    return _latest[name]
+
+
+# Estruturas derivadas publicadas junto com o frame (o motor é montado em cada processo)
+def _parts(dataset):
+    parts = {"cube": dataset.cube}
+    if dataset.index is not None:
+        parts["index"] = dataset.index.parts()
+    if dataset.kpi is not None:
+        parts["kpi"] = dataset.kpi.parts()
+    return parts
+
+
+def _load_veiculos():
+    raw = _step("veiculos.consulta", incremental.load_view, queries.requirement_for("vw_veiculos_finalizados"))
+    return _step("veiculos.preprocess", preprocess.prepare_veiculos, raw)
+
+
+# Estruturas derivadas do frame; com partes publicadas, só as monta sobre elas
+def _derive_veiculos(frame, parts=None):
+    if parts is None:
+        veiculos_cube = _step("veiculos.cube", cube.build_veiculos_cube, frame)
+        index = _step("veiculos.search_index", search.SubstringIndex, frame["summary"])
+    else:
+        veiculos_cube = parts["cube"]
+        index = search.SubstringIndex.from_parts(parts["index"])
+    return Dataset(
+        frame=frame,
+        cube=veiculos_cube,
+        engine=_step("veiculos.engine", engine.veiculos_engine, frame, veiculos_cube),
+        index=index,
+        marcas=frame["marca"].cat.categories.tolist(),
+        loaded_at=datetime.now(),
+    )
+
+
+def _load_kits():
+    raw = _step("kits.consulta", incremental.load_view, queries.requirement_for("vw_vidros_kits"))
+    return _step("kits.preprocess", preprocess.prepare_kits, raw)
+
+
+def _derive_kits(frame, parts=None):
+    if parts is None:
+        kits_cube = _step("kits.cube", cube.build_kits_cube, frame)
+        kpi_index = _step("kits.kpi", kpi.DistinctKeyIndex, frame["dt_faturado"], frame["key"])
+    else:
+        kits_cube = parts["cube"]
+        kpi_index = kpi.DistinctKeyIndex.from_parts(parts["kpi"])
+    return Dataset(
+        frame=frame,
+        cube=kits_cube,
+        engine=_step("kits.engine", engine.kits_engine, frame, kits_cube, kpi_index),
+        kpi=kpi_index,
+        loaded_at=datetime.now(),
+    )
+
+
+def build_veiculos():
+    return _build("veiculos", _load_veiculos, _derive_veiculos)
+
+
+def build_kits():
+    return _build("kits", _load_kits, _derive_kits)
+
+
+BUILDERS = {
+    "veiculos": build_veiculos,
+    "kits": build_kits,
+}
+
+
+# Conjunto de dados usado por cada dashboard; só ele é esperado ao abrir o dashboard
+DASHBOARD_DATASETS = {
+    "Veículos Finalizados": "veiculos",
+    "Termômetro de Prazo": "veiculos",
+    "Kits Faturados": "kits",
+}
@@ -0,0 +1,251 @@
+import threading
+
+import aggregations
+import config
+import cube
+import timeindex
+
+# Motores de agregação dos gráficos. Cada Dataset carrega o seu: o padrão ("pandas")
+# recorta os cubos pré-calculados; o "duckdb" mantém o frame como tabela Arrow e
+# executa cada agregação como SQL vetorizado e multi-thread no DuckDB.
+
+# Trecho que cada método varre, para a instrumentação: o índice de tempo que recorta a
+# entrada e quantos argumentos ele consome (None = a tabela inteira). Métodos fora do
+# mapa, como os cards, leem o índice de distintos e não varrem linhas.
+_VEICULOS_SCANS = {
+    "por_mes": None,
+    "por_semana": ("meses", 1),
+    "por_marca": ("meses", 1),
+    "por_modelo": ("meses", 1),
+    "prazo_status": ("meses", 1),
+    "marca_prazo_status": ("meses", 1),
+    "mapa_calor": ("meses", 1),
+}
+_KITS_SCANS = {
+    "por_mes": ("anos", 1),
+    "por_semana": ("meses", 1),
+    "por_dia": ("dias", 2),
+}
+
+
+def _rows_in(engine, scans, method, args):
+    if method not in scans:
+        return None
+    if scans[method] is None:
+        return engine.rows
+    index, count = scans[method]
+    rows = getattr(engine, index).slice(*args[:count])
+    return rows.stop - rows.start
+
+
+class PandasVeiculos:
+    def __init__(self, frame, veiculos_cube):
+        self.cube = veiculos_cube
+        self.meses = timeindex.TimeIndex(veiculos_cube["mes"])
+        self.rows = len(veiculos_cube)
+
+    def rows_in(self, method, *args):
+        return _rows_in(self, _VEICULOS_SCANS, method, args)
+
+    # Linhas do cubo no mês, por busca binária nas fronteiras dos meses
+    def _mes(self, mes):
+        return self.cube.iloc[self.meses.slice(mes)]
+
+    def por_mes(self):
+        return aggregations.veiculos_por_mes(self.cube)
+
+    def por_semana(self, mes):
+        return aggregations.veiculos_por_semana(self._mes(mes))
+
+    def por_marca(self, mes):
+        return aggregations.veiculos_por_marca(self._mes(mes))
+
+    def por_modelo(self, mes, marca):
+        return aggregations.veiculos_por_modelo(self._mes(mes), marca)
+
+    def prazo_status(self, mes):
+        return aggregations.prazo_status(self._mes(mes))
+
+    def marca_prazo_status(self, mes):
+        return aggregations.marca_prazo_status(self._mes(mes))
+
+    def mapa_calor(self, mes):
+        return aggregations.mapa_calor(self._mes(mes))
+
+
+class PandasKits:
+    def __init__(self, frame, kits_cube, kpi_index):
+        self.cube = kits_cube
+        self.kpi = kpi_index
+        # O cubo de kits está em ordem de (ano, mês, semana, dia): as três colunas são crescentes
+        self.anos = timeindex.TimeIndex(kits_cube["ano"])
+        self.meses = timeindex.TimeIndex(kits_cube["mes"])
+        self.dias = timeindex.TimeIndex(kits_cube["data"])
+        self.rows = len(kits_cube)
+
+    def rows_in(self, method, *args):
+        return _rows_in(self, _KITS_SCANS, method, args)
+
+    def cards(self, now):
+        return aggregations.kits_cards(self.kpi, now)
+
+    def distintos(self, inicio, fim):
+        return self.kpi.count_range(inicio, fim)
+
+    def por_mes(self, ano):
+        return aggregations.kits_por_mes(self.cube.iloc[self.anos.slice(ano)])
+
+    def por_semana(self, mes):
+        return aggregations.kits_por_semana(self.cube.iloc[self.meses.slice(mes)])
+
+    def por_dia(self, inicio, fim):
+        return aggregations.kits_por_dia(self.cube.iloc[self.dias.slice(inicio, fim)])
+
+
+_MES_LABEL = "printf('%04d-%02d', mes // 12, mes % 12 + 1)"
+_PRAZO_LABEL = "CASE WHEN dentro_prazo THEN 'Dentro do Prazo' ELSE 'Fora do Prazo' END"
+_SEMANA_DESCRICAO = "CAST(semana AS VARCHAR) || 'ª Semana'"
+
+
+# Base dos motores DuckDB: as colunas usadas nas consultas são convertidas uma vez para
+# Arrow e registradas, sem cópia, num cursor por thread (tabelas registradas não são
+# visíveis entre cursores). Consultas de um período leem só o trecho contíguo dele,
+# registrado como 'recorte' (o frame está em ordem de data).
+class _DuckDBEngine:
+    table = None
+    columns = None
+
+    def __init__(self, frame):
+        import duckdb
+        import pyarrow as pa
+
+        self.arrow = pa.Table.from_pandas(frame[self.columns], preserve_index=False)
+        self.rows = self.arrow.num_rows
+        self._connection = duckdb.connect()
+        self._local = threading.local()
+
+    def _cursor(self):
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._connection.cursor()
+            cursor.register(self.table, self.arrow)
+            self._local.cursor = cursor
+        return cursor
+
+    def query(self, sql, params=None, rows=None):
+        # Escalares numpy (vindos dos seletores) viram tipos Python, que o DuckDB aceita
+        params = [p.item() if hasattr(p, "item") else p for p in params or []]
+        cursor = self._cursor()
+        if rows is not None:
+            cursor.register("recorte", self.arrow.slice(rows.start, rows.stop - rows.start))
+        return cursor.execute(sql, params).df()
+
+
+class DuckDBVeiculos(_DuckDBEngine):
+    table = "veiculos"
+    columns = cube.VEICULOS_DIMS
+
+    def __init__(self, frame, veiculos_cube=None):
+        super().__init__(frame)
+        self.meses = timeindex.TimeIndex(frame["mes"])
+
+    def rows_in(self, method, *args):
+        return _rows_in(self, _VEICULOS_SCANS, method, args)
+
+    def por_mes(self):
+        return self.query(f"""
+            SELECT {_MES_LABEL} AS mes, quantidade
+            FROM (SELECT mes, count(*) AS quantidade FROM veiculos GROUP BY mes)
+            ORDER BY 1
+        """)
+
+    def por_semana(self, mes):
+        return self.query(f"""
+            SELECT semana, count(*) AS quantidade, {_SEMANA_DESCRICAO} AS semana_descricao
+            FROM recorte GROUP BY semana ORDER BY semana
+        """, rows=self.meses.slice(mes))
+
+    def por_marca(self, mes):
+        return self.query("""
+            SELECT marca, count(*) AS quantidade
+            FROM recorte GROUP BY marca ORDER BY marca
+        """, rows=self.meses.slice(mes))
+
+    def por_modelo(self, mes, marca):
+        return self.query("""
+            SELECT modelo, count(*) AS quantidade
+            FROM recorte WHERE marca = ? GROUP BY modelo ORDER BY modelo
+        """, [marca], rows=self.meses.slice(mes))
+
+    def prazo_status(self, mes):
+        return self.query(f"""
+            SELECT {_PRAZO_LABEL} AS dentro_prazo, count(*) AS quantidade
+            FROM recorte GROUP BY recorte.dentro_prazo ORDER BY 1
+        """, rows=self.meses.slice(mes))
+
+    def marca_prazo_status(self, mes):
+        return self.query(f"""
+            SELECT marca, {_PRAZO_LABEL} AS dentro_prazo, count(*) AS quantidade
+            FROM recorte GROUP BY marca, recorte.dentro_prazo ORDER BY 1, 2
+        """, rows=self.meses.slice(mes))
+
+    def mapa_calor(self, mes):
+        return self.query(f"""
+            SELECT dia, dentro_prazo, count(*) AS quantidade, {_PRAZO_LABEL} AS Prazo
+            FROM recorte GROUP BY dia, dentro_prazo ORDER BY dia, dentro_prazo
+        """, rows=self.meses.slice(mes))
+
+
+class DuckDBKits(_DuckDBEngine):
+    table = "kits"
+    columns = cube.KITS_DIMS
+
+    def __init__(self, frame, kits_cube, kpi_index):
+        super().__init__(frame)
+        self.kpi = kpi_index
+        self.anos = timeindex.TimeIndex(frame["ano"])
+        self.meses = timeindex.TimeIndex(frame["mes"])
+        self.dias = timeindex.TimeIndex(frame["data"])
+
+    def rows_in(self, method, *args):
+        return _rows_in(self, _KITS_SCANS, method, args)
+
+    # Contagens distintas vêm do índice pré-calculado, não de uma varredura da tabela
+    def cards(self, now):
+        return aggregations.kits_cards(self.kpi, now)
+
+    def distintos(self, inicio, fim):
+        return self.kpi.count_range(inicio, fim)
+
+    def por_mes(self, ano):
+        return self.query(f"""
+            SELECT {_MES_LABEL} AS mes, quantidade
+            FROM (SELECT mes, count(*) AS quantidade FROM recorte GROUP BY mes)
+            ORDER BY 1
+        """, rows=self.anos.slice(ano))
+
+    def por_semana(self, mes):
+        return self.query(f"""
+            SELECT semana, count(*) AS quantidade, {_SEMANA_DESCRICAO} AS semana_descricao
+            FROM recorte GROUP BY semana ORDER BY semana
+        """, rows=self.meses.slice(mes))
+
+    def por_dia(self, inicio, fim):
+        return self.query("""
+            SELECT data AS dt_faturado, count(*) AS quantidade
+            FROM recorte GROUP BY data ORDER BY data
+        """, rows=self.dias.slice(inicio, fim))
+
+
+ENGINES = {
+    "pandas": (PandasVeiculos, PandasKits),
+    "duckdb": (DuckDBVeiculos, DuckDBKits),
+}
+
+
+def veiculos_engine(frame, veiculos_cube, kind=None):
+    return ENGINES[kind or config.AGGREGATION_ENGINE][0](frame, veiculos_cube)
+
+
+def kits_engine(frame, kits_cube, kpi_index, kind=None):
+    return ENGINES[kind or config.AGGREGATION_ENGINE][1](frame, kits_cube, kpi_index)
@@ -0,0 +1,110 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import config
+import preprocess
+import sources
+
+
+# Caminho do snapshot Parquet local de uma view
+def snapshot_path(view):
+    return os.path.join(config.SNAPSHOT_DIR, f"{view}.parquet")
+
+
+# Metadados do snapshot: colunas e início do período que ele cobre e a versão dos dados
+# da fonte quando ele foi gravado (ver sources.LocalSource.version)
+def metadata_path(view):
+    return os.path.join(config.SNAPSHOT_DIR, f"{view}.json")
+
+
+def read_snapshot(view):
+    path = snapshot_path(view)
+    if not os.path.exists(path) or not os.path.exists(metadata_path(view)):
+        return None, None
+    with open(metadata_path(view)) as f:
+        metadata = json.load(f)
+    return pq.read_table(path).to_pandas(types_mapper=preprocess.arrow_dtype), metadata
+
+
+# Grava o snapshot de forma atômica (arquivo temporário + rename)
+def write_snapshot(view, df, req, source_version=None):
+    os.makedirs(config.SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(view)
+    df.to_parquet(path + ".tmp", index=False)
+    metadata = {
+        "columns": list(req.columns),
+        "start": None if req.start is None else str(pd.Timestamp(req.start)),
+        "source_version": source_version,
+    }
+    with open(metadata_path(view) + ".tmp", "w") as f:
+        json.dump(metadata, f)
+    os.replace(path + ".tmp", path)
+    os.replace(metadata_path(view) + ".tmp", metadata_path(view))
+
+
+# Maior data já vista no snapshot (marca d'água), sem fuso horário. Limitada ao momento
+# da carga: uma linha com data no futuro não pode adiar a busca das linhas de hoje.
+def watermark(df, date_column):
+    ultimo = preprocess.to_naive(df[date_column]).max()
+    if pd.isna(ultimo):
+        return ultimo
+    return min(ultimo, pd.Timestamp.now())
+
+
+# O snapshot só serve se tiver todas as colunas pedidas e começar no máximo no início pedido
+def covers(metadata, req):
+    if not set(req.columns) <= set(metadata["columns"]):
+        return False
+    if metadata["start"] is None:
+        return True
+    return req.start is not None and pd.Timestamp(req.start) >= pd.Timestamp(metadata["start"])
+
+
+def fetch(req, since=None):
+    date_column = config.VIEWS[req.view]["date_column"]
+    start = req.start
+    if since is not None:
+        start = since if start is None else max(pd.Timestamp(start), since)
+    return sources.get_source().query(req.view, req.columns, date_column, start, req.end)
+
+
+# Junta o snapshot com as linhas novas: descarta do snapshot tudo que está dentro
+# da janela rebuscada e, se houver chave, mantém a versão mais recente de cada linha
+def merge(snapshot, novos, date_column, key_column, cutoff):
+    mantidos = snapshot[~(preprocess.to_naive(snapshot[date_column]) >= cutoff)]
+    merged = pd.concat([mantidos, novos], ignore_index=True)
+    if key_column is not None and key_column in merged.columns:
+        merged = merged.drop_duplicates(subset=[key_column], keep="last", ignore_index=True)
+    return merged
+
+
+# Carrega uma view buscando no Athena apenas as linhas mais novas que o snapshot local.
+# Se a fonte informa que os dados da view não mudaram desde o snapshot, não consulta.
+def load_view(req):
+    settings = config.VIEWS[req.view]
+    date_column = settings["date_column"]
+    key_column = settings.get("key_column")
+    # Lida antes da consulta: uma alteração durante a busca força nova consulta depois
+    versao = sources.get_source().version(req.view)
+
+    snapshot, metadata = read_snapshot(req.view)
+    ultimo = None
+    if snapshot is not None and covers(metadata, req):
+        if versao is not None and metadata.get("source_version") == versao:
+            return snapshot[list(req.columns)]
+        if not snapshot.empty:
+            ultimo = watermark(snapshot, date_column)
+
+    if ultimo is None or pd.isna(ultimo):
+        df = fetch(req)
+        write_snapshot(req.view, df, req, versao)
+        return df
+
+    cutoff = ultimo - pd.Timedelta(days=config.LOOKBACK_DAYS)
+    novos = fetch(req, cutoff)
+    df = merge(snapshot[list(req.columns)], novos, date_column, key_column, cutoff)
+    write_snapshot(req.view, df, req, versao)
+    return df
@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Com a instrumentação ligada, uma linha JSON por rerun (e os resumos p50/p95) vai para
+# o stderr; DASH_INSTRUMENTATION_LOG grava as mesmas linhas também em um arquivo
+if config.INSTRUMENTATION:
+    _handlers = [logging.StreamHandler()]
+    if config.INSTRUMENTATION_LOG:
+        _handlers.append(logging.FileHandler(config.INSTRUMENTATION_LOG))
+    for _handler in _handlers:
+        _handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Histórico recente de tempos (ms) por seção, compartilhado por todas as sessões do processo
+_history = defaultdict(lambda: deque(maxlen=config.INSTRUMENTATION_HISTORY))
+_history_lock = threading.Lock()
+_runs = 0
+_current = threading.local()
+
+
+def _rows(obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(obj)
+    return None
+
+
+# Medição de uma seção nomeada (ex.: "1. Veículos Finalizados por Mês"): tempo total,
+# tempo de cada etapa interna, linhas de entrada e saída, tamanho do resultado e do
+# gráfico serializado
+class Section:
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.result_bytes = None
+        self.payload_bytes = None
+        self.stages = {}
+        self.wall_ms = None
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    # Executa uma agregação medindo seu tempo e as linhas de entrada e saída
+    def aggregate(self, fn, *args, **kwargs):
+        if self.rows_in is None:
+            # Linhas da entrada: para métodos de um motor, o trecho que ele varre com estes
+            # argumentos; senão, o tamanho do primeiro argumento
+            engine = getattr(fn, "__self__", None)
+            if hasattr(engine, "rows_in"):
+                self.rows_in = engine.rows_in(fn.__name__, *args)
+            elif args:
+                self.rows_in = _rows(args[0])
+        with self.stage("agregacao"):
+            result = fn(*args, **kwargs)
+        self.rows_out = _rows(result)
+        self.result_bytes = _nbytes(result)
+        return result
+
+    def as_dict(self):
+        return {
+            "section": self.name,
+            "wall_ms": round(self.wall_ms, 3),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "result_bytes": self.result_bytes,
+            "payload_bytes": self.payload_bytes,
+            **{f"{stage}_ms": round(ms, 3) for stage, ms in self.stages.items()},
+        }
+
+
+# Seção inativa, usada quando a instrumentação está desligada
+class _NullSection(Section):
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def aggregate(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+# Memória residente do processo em MB (em /proc quando disponível; senão, o pico)
+def process_memory_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _nbytes(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    return sys.getsizeof(obj)
+
+
+# Memória (MB) das estruturas de um Dataset, compartilhadas por todas as sessões
+def dataset_memory_mb(dataset):
+    parts = [dataset.frame, dataset.cube, dataset.index, dataset.kpi]
+    return sum(_nbytes(p) for p in parts if p is not None) / 2**20
+
+
+# Chave em st.session_state com os bytes mantidos por seção na sessão
+_SESSION_BYTES = "_instrumentacao_bytes"
+
+
+# Registra o que a sessão mantém de uma seção: o resultado da agregação e o payload do
+# gráfico do último rerun dela (um fragmento reexecuta só a sua seção). Só em seções
+# executadas pelo script de uma sessão, não na carga em segundo plano.
+def _hold(s):
+    st.session_state.setdefault(_SESSION_BYTES, {})[s.name] = (s.result_bytes or 0) + (s.payload_bytes or 0)
+
+
+# Memória (KB) que é só da sessão: resultados e payloads de gráficos do último rerun
+# de cada seção
+def session_memory_kb():
+    return sum(st.session_state.get(_SESSION_BYTES, {}).values()) / 1024
+
+
+# Tamanho (KB) dos valores guardados em st.session_state (seletores, busca etc.)
+def session_state_kb():
+    values = st.session_state.to_dict()
+    values.pop(_SESSION_BYTES, None)
+    return sum(_nbytes(v) for v in values.values()) / 1024
+
+
+def _record(sections):
+    with _history_lock:
+        for s in sections:
+            _history[s.name].append(s.wall_ms)
+
+
+# Execução (rerun) do script de uma sessão; agrupa as seções medidas nela
+class Run:
+    def __init__(self, label):
+        self.label = label
+        self.sections = []
+        self.started = time.perf_counter()
+
+    def finish(self):
+        global _runs
+        total_ms = (time.perf_counter() - self.started) * 1000
+        _record(self.sections)
+        logger.info(json.dumps({
+            "event": "rerun",
+            "label": self.label,
+            "total_ms": round(total_ms, 3),
+            "rss_mb": round(process_memory_mb(), 1),
+            "session_kb": round(session_memory_kb(), 1),
+            "sections": [s.as_dict() for s in self.sections],
+        }, ensure_ascii=False))
+        with _history_lock:
+            _runs += 1
+            log_summary = _runs % config.INSTRUMENTATION_SUMMARY_EVERY == 0
+        if log_summary:
+            logger.info(json.dumps({"event": "summary", "sections": summary()}, ensure_ascii=False))
+
+
+def begin_run(label):
+    _current.run = Run(label) if config.INSTRUMENTATION else None
+    if _current.run is not None:
+        # Um rerun completo redesenha a página: o que a sessão mantinha antes é descartado
+        st.session_state[_SESSION_BYTES] = {}
+    return _current.run
+
+
+def end_run():
+    run = getattr(_current, "run", None)
+    _current.run = None
+    if run is not None:
+        run.finish()
+    return run
+
+
+def current_run():
+    return getattr(_current, "run", None)
+
+
+# Mede uma seção. Dentro de um rerun ela entra no log da execução; fora dele (por
+# exemplo, na carga em segundo plano) é registrada e logada isoladamente.
+@contextmanager
+def section(name, rows_in=None):
+    if not config.INSTRUMENTATION:
+        yield _NullSection(name)
+        return
+    run = current_run()
+    s = Section(name, rows_in)
+    start = time.perf_counter()
+    previous = getattr(_current, "section", None)
+    _current.section = s
+    try:
+        yield s
+    finally:
+        _current.section = previous
+        s.wall_ms = (time.perf_counter() - start) * 1000
+        if get_script_run_ctx(suppress_warning=True) is not None:
+            _hold(s)
+        if run is not None:
+            run.sections.append(s)
+        else:
+            _record([s])
+            logger.info(json.dumps({"event": "section", **s.as_dict()}, ensure_ascii=False))
+
+
+# Tamanho do gráfico como o Streamlit o envia: especificação Vega-Lite em JSON (sem os
+# dados) mais os dados do gráfico em Arrow IPC, uma vez por conteúdo distinto
+def _payload_bytes(chart):
+    spec = chart.to_dict()
+    spec.pop("datasets", None)
+    table = pa.Table.from_pandas(chart.data, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return len(json.dumps(spec).encode()) + sink.getvalue().size
+
+
+# st.altair_chart medindo a construção da especificação Vega-Lite, o tamanho do
+# payload serializado e o envio ao navegador, na seção corrente
+def altair_chart(chart, **kwargs):
+    s = getattr(_current, "section", None)
+    if s is None or not config.INSTRUMENTATION:
+        return st.altair_chart(chart, **kwargs)
+    with s.stage("spec"):
+        s.payload_bytes = _payload_bytes(chart)
+    with s.stage("render"):
+        return st.altair_chart(chart, **kwargs)
+
+
+# p50/p95 (ms) e contagem por seção, sobre o histórico recente do processo
+def summary():
+    with _history_lock:
+        snapshot = {name: list(times) for name, times in _history.items()}
+    return {
+        name: {
+            "count": len(times),
+            "p50_ms": round(float(np.percentile(times, 50)), 3),
+            "p95_ms": round(float(np.percentile(times, 95)), 3),
+        }
+        for name, times in snapshot.items() if times
+    }
+
+
+def is_admin(username):
+    return config.INSTRUMENTATION and username in config.ADMIN_USERS
+
+
+# Painel lateral (apenas administradores) com as seções do último rerun, os percentis e
+# a memória do processo, dos conjuntos de dados carregados e da sessão
+def show_panel(run, loaded=None):
+    with st.sidebar.expander("Desempenho"):
+        if run is not None and run.sections:
+            st.caption(f"Último rerun: {(time.perf_counter() - run.started) * 1000:.1f} ms")
+            st.dataframe([s.as_dict() for s in run.sections], hide_index=True)
+        st.caption(
+            f"Memória do processo: {process_memory_mb():.1f} MB · sessão: {session_memory_kb():.1f} KB "
+            f"(resultados e gráficos) · session_state: {session_state_kb():.1f} KB"
+        )
+        if loaded:
+            st.dataframe([{"dataset": name, "memoria_mb": round(dataset_memory_mb(d), 1)} for name, d in loaded.items()], hide_index=True)
+        resumo = summary()
+        if resumo:
+            st.caption("Histórico do processo (ms)")
+            st.dataframe([{"section": name, **stats} for name, stats in sorted(resumo.items())], hide_index=True)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Dias desde 1970-01-01 (uma quinta-feira) até a segunda-feira da mesma semana ISO
+_EPOCH_WEEKDAY = 3
+# Código de mês (ano * 12 + mês - 1) de 1970-01, para converter meses numpy
+_EPOCH_MONTH = 1970 * 12
+
+
+def _day_numbers(dates):
+    return pd.Series(dates).to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+
+# Segunda-feira (em dias desde 1970-01-01) da semana ISO de cada dia; identifica a
+# semana com o ano, ao contrário do número da semana sozinho
+def _week_starts(days):
+    return days - (days + _EPOCH_WEEKDAY) % 7
+
+
+def _month_codes(days):
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) + _EPOCH_MONTH
+
+
+# Pares (grupo, id) distintos, ordenados por grupo e id. Devolve os grupos distintos,
+# o início de cada grupo em ids e os ids.
+def _group_unique(groups, ids, n_ids):
+    if len(groups) == 0:
+        return np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32)
+    base = groups.min()
+    pairs = np.sort((groups - base) * n_ids + ids)
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+    groups, ids = np.divmod(pairs, n_ids)
+    starts = np.r_[0, np.flatnonzero(np.diff(groups)) + 1, len(ids)]
+    return groups[starts[:-1]] + base, starts, ids.astype(np.int32)
+
+
+# Índice de chaves distintas por dia (ex.: kits faturados). Guarda, para cada dia, os
+# ids ordenados das chaves presentes, e pré-calcula as contagens por semana ISO e por
+# mês; qualquer outro intervalo é respondido unindo os dias, sem voltar às linhas.
+class DistinctKeyIndex:
+    def __init__(self, dates, keys):
+        ids, uniques = pd.factorize(pd.Series(keys), use_na_sentinel=True)
+        days = _day_numbers(dates)
+        valid = (ids >= 0) & ~np.isnat(pd.Series(dates).to_numpy(dtype="datetime64[ns]"))
+        ids, days = ids[valid].astype(np.int64), days[valid]
+        self.n_keys = len(uniques)
+
+        n = max(self.n_keys, 1)
+        self.days, self.starts, self.ids = _group_unique(days, ids, n)
+        self.weeks = self._counts(_week_starts(days), ids, n)
+        self.months = self._counts(_month_codes(days), ids, n)
+
+    @staticmethod
+    def _counts(groups, ids, n):
+        groups, starts, _ = _group_unique(groups, ids, n)
+        return dict(zip(groups.tolist(), np.diff(starts).tolist()))
+
+    # Arrays do índice, para publicar em config.SHARED_DIR (ver shared.publish). As
+    # contagens por semana e por mês vão como pares (grupo, contagem).
+    def parts(self):
+        return {
+            "days": self.days,
+            "starts": self.starts,
+            "ids": self.ids,
+            "n_keys": np.array(self.n_keys),
+            "weeks": np.array(list(self.weeks.items()), dtype=np.int64).reshape(-1, 2),
+            "months": np.array(list(self.months.items()), dtype=np.int64).reshape(-1, 2),
+        }
+
+    # Índice sobre partes publicadas (mapeadas em memória), sem reconstruir nada
+    @classmethod
+    def from_parts(cls, parts):
+        index = cls.__new__(cls)
+        index.days, index.starts, index.ids = parts["days"], parts["starts"], parts["ids"]
+        index.n_keys = int(parts["n_keys"])
+        index.weeks = dict(zip(parts["weeks"][:, 0].tolist(), parts["weeks"][:, 1].tolist()))
+        index.months = dict(zip(parts["months"][:, 0].tolist(), parts["months"][:, 1].tolist()))
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return int(self.days.nbytes + self.starts.nbytes + self.ids.nbytes)
+
+    def _day(self, day):
+        return int(np.datetime64(pd.Timestamp(day).date(), "D").astype(np.int64))
+
+    # Chaves distintas em um dia
+    def count_day(self, day):
+        d = self._day(day)
+        i = np.searchsorted(self.days, d)
+        if i == len(self.days) or self.days[i] != d:
+            return 0
+        return int(self.starts[i + 1] - self.starts[i])
+
+    # Chaves distintas na semana ISO (segunda a domingo) que contém o dia
+    def count_week(self, day):
+        return self.weeks.get(int(_week_starts(np.int64(self._day(day)))), 0)
+
+    # Chaves distintas em um mês (código ano * 12 + mês - 1)
+    def count_month(self, mes):
+        return self.months.get(int(mes), 0)
+
+    # Chaves distintas entre dois dias (inclusive), unindo os ids de cada dia
+    def count_range(self, inicio, fim):
+        lo = np.searchsorted(self.days, self._day(inicio), side="left")
+        hi = np.searchsorted(self.days, self._day(fim), side="right")
+        if hi - lo <= 1:
+            return int(self.starts[hi] - self.starts[lo])
+        # Os dias são contíguos em ids: trechos curtos são ordenados; longos marcam um bitmap
+        trecho = self.ids[self.starts[lo]:self.starts[hi]]
+        if len(trecho) * 8 < self.n_keys:
+            trecho = np.sort(trecho)
+            return int(np.count_nonzero(np.r_[True, trecho[1:] != trecho[:-1]]))
+        seen = np.zeros(self.n_keys, dtype=bool)
+        seen[trecho] = True
+        return int(np.count_nonzero(seen))
@@ -0,0 +1,96 @@
+import pandas as pd
+import pyarrow as pa
+
+
+# Converte para datetime sem fuso horário (datas inválidas viram NaT)
+def to_naive(series):
+    dates = pd.to_datetime(series, errors="coerce")
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates
+
+
+# Código inteiro do mês (ano * 12 + mês - 1), usado no lugar de strings 'AAAA-MM'
+def period_code(dates):
+    return (dates.dt.year * 12 + dates.dt.month - 1).astype("int32")
+
+
+def current_period_code(now):
+    return now.year * 12 + now.month - 1
+
+
+def mes_label(code):
+    return f"{code // 12:04d}-{code % 12 + 1:02d}"
+
+
+def mes_labels(codes):
+    codes = pd.Series(codes)
+    return (codes // 12).astype(str).str.zfill(4) + "-" + (codes % 12 + 1).astype(str).str.zfill(2)
+
+
+# Dimensão categórica com as categorias (poucas) em object, qualquer que seja o tipo de
+# texto da fonte: o frame local e o mapeado de config.SHARED_DIR ficam com os mesmos tipos
+def _category(values):
+    values = values.astype("category")
+    return values.cat.rename_categories(values.cat.categories.astype(object))
+
+
+# Colunas de tempo derivadas da data de cada registro
+TIME_COLUMNS = {
+    "mes": period_code,
+    "ano": lambda dates: dates.dt.year.astype("int16"),
+    "semana": lambda dates: ((dates.dt.day - 1) // 7 + 1).astype("int8"),
+    "dia": lambda dates: dates.dt.day.astype("int8"),
+    "data": lambda dates: dates.dt.normalize(),
+}
+
+# Textos livres (summary, chaves) ficam em Arrow, sem um objeto Python por linha
+TEXT_DTYPE = "string[pyarrow]"
+
+
+# Tipo pandas de cada coluna ao converter dados Arrow (types_mapper de to_pandas):
+# textos em TEXT_DTYPE, as demais colunas no tipo padrão
+def arrow_dtype(arrow_type):
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.api.types.pandas_dtype(TEXT_DTYPE)
+    return None
+
+
+# Só as colunas de tempo que os dashboards do conjunto de dados usam
+def _time_columns(dates, columns):
+    return {name: TIME_COLUMNS[name](dates) for name in columns}
+
+
+# Frame de veículos pronto para os dashboards: datas tipadas, dimensões categóricas,
+# colunas de tempo e flag de prazo vetorizada, em ordem de data de finalização (cada
+# mês ou dia é um trecho contíguo; ver timeindex). O frame de entrada não é alterado.
+def prepare_veiculos(raw):
+    dt_finalizacao = to_naive(raw["dt_finalizacao"])
+    valid = dt_finalizacao.notna()
+    dt_finalizacao = dt_finalizacao[valid]
+    dt_contrato = to_naive(raw.loc[valid, "dt_contrato"])
+
+    data = pd.DataFrame({
+        "summary": raw.loc[valid, "summary"].astype(TEXT_DTYPE),
+        "marca": _category(raw.loc[valid, "marca"]),
+        "modelo": _category(raw.loc[valid, "modelo"]),
+        "dt_finalizacao": dt_finalizacao,
+        "dt_contrato": dt_contrato,
+        **_time_columns(dt_finalizacao, ["mes", "semana", "dia"]),
+        "dentro_prazo": dt_finalizacao <= dt_contrato,
+    })
+    return data.sort_values("dt_finalizacao", kind="stable", ignore_index=True)
+
+
+# Frame de kits pronto para os dashboards, em ordem de data de faturamento
+def prepare_kits(raw):
+    dt_faturado = to_naive(raw["dt_faturado"])
+    valid = dt_faturado.notna()
+    dt_faturado = dt_faturado[valid]
+
+    data = pd.DataFrame({
+        "key": raw.loc[valid, "key"].astype(TEXT_DTYPE),
+        "dt_faturado": dt_faturado,
+        **_time_columns(dt_faturado, ["ano", "mes", "semana", "data"]),
+    })
+    return data.sort_values("dt_faturado", kind="stable", ignore_index=True)
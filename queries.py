@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+import pandas as pd
+
+import config
+
+# Requisito de dados de um dashboard: view, colunas usadas e período (None = sem limite)
+Requirement = namedtuple("Requirement", ["view", "columns", "start", "end"], defaults=[None, None])
+
+# Colunas e períodos que cada dashboard realmente usa
+DASHBOARD_REQUIREMENTS = {
+    "Veículos Finalizados": [
+        Requirement("vw_veiculos_finalizados", ["summary", "marca", "modelo", "dt_finalizacao", "dt_contrato"]),
+    ],
+    "Termômetro de Prazo": [
+        Requirement("vw_veiculos_finalizados", ["marca", "dt_finalizacao", "dt_contrato"]),
+    ],
+    "Kits Faturados": [
+        Requirement("vw_vidros_kits", ["key", "dt_faturado"]),
+    ],
+}
+
+
+def _union(a, b):
+    return a + [c for c in b if c not in a]
+
+
+# Junta os requisitos de uma mesma view: união das colunas e o período mais amplo.
+# A coluna de data (e a chave, se a view tiver) entra sempre: a carga incremental depende dela.
+def combine(requirements):
+    combined = {}
+    for req in requirements:
+        settings = config.VIEWS[req.view]
+        required = [c for c in (settings["date_column"], settings.get("key_column")) if c is not None]
+        columns = _union(list(req.columns), required)
+        if req.view not in combined:
+            combined[req.view] = Requirement(req.view, columns, req.start, req.end)
+            continue
+        atual = combined[req.view]
+        start = None if atual.start is None or req.start is None else min(atual.start, req.start)
+        end = None if atual.end is None or req.end is None else max(atual.end, req.end)
+        combined[req.view] = Requirement(req.view, _union(atual.columns, columns), start, end)
+    return combined
+
+
+def all_requirements():
+    return [req for reqs in DASHBOARD_REQUIREMENTS.values() for req in reqs]
+
+
+def requirement_for(view):
+    return combine(all_requirements())[view]
+
+
+def _timestamp(value):
+    return f"TIMESTAMP '{pd.Timestamp(value):%Y-%m-%d %H:%M:%S}'"
+
+
+# Monta o SQL mais estreito possível: só as colunas pedidas e filtro pela coluna de data
+def build_sql(view, columns=None, date_column=None, start=None, end=None):
+    select = ", ".join(columns) if columns else "*"
+    query = f"SELECT {select} FROM {view}"
+    conditions = []
+    if date_column is not None and start is not None:
+        conditions.append(f"{date_column} >= {_timestamp(start)}")
+    if date_column is not None and end is not None:
+        conditions.append(f"{date_column} <= {_timestamp(end)}")
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return query
+
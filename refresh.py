@@ -0,0 +1,114 @@
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+# Atualizador em segundo plano, único por processo. Cada conjunto de dados é carregado
+# na primeira vez que é pedido (com prioridade) ou pré-carregado (no fim da fila), e
+# depois reconstruído a cada intervalo. As sessões sempre leem a última versão válida,
+# que é trocada atomicamente quando a nova fica pronta. Com mais de um worker, conjuntos
+# de dados diferentes carregam em paralelo (as consultas esperam a fonte, não a CPU).
+class Refresher:
+    def __init__(self, builders, interval, workers=1):
+        self._builders = builders
+        self._interval = interval
+        self._workers = max(1, workers)
+        self._snapshots = {}
+        # Tentativas de carga já terminadas (com ou sem sucesso) de cada conjunto de dados
+        self._attempts = dict.fromkeys(builders, 0)
+        self._pending = deque()
+        self._loading = set()
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        with self._condition:
+            if not self._threads:
+                self._threads = [
+                    threading.Thread(target=self._work, name=f"data-loader-{i}", daemon=True)
+                    for i in range(self._workers)
+                ]
+                self._threads.append(threading.Thread(target=self._schedule, name="data-refresher", daemon=True))
+                for thread in self._threads:
+                    thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    # Coloca um conjunto de dados na fila de carga; com prioridade ele vai para a frente
+    def request(self, name, priority=False):
+        with self._condition:
+            if name in self._loading:
+                return
+            if name in self._pending:
+                if not priority:
+                    return
+                self._pending.remove(name)
+            if priority:
+                self._pending.appendleft(name)
+            else:
+                self._pending.append(name)
+            self._condition.notify()
+
+    # Pré-carrega um conjunto de dados que ainda não foi carregado nem pedido
+    def prefetch(self, name):
+        if not self.is_ready(name):
+            self.request(name)
+
+    def _work(self):
+        while not self._stop.is_set():
+            with self._condition:
+                while not self._pending and not self._stop.is_set():
+                    self._condition.wait()
+                if self._stop.is_set():
+                    return
+                name = self._pending.popleft()
+                self._loading.add(name)
+            try:
+                self.refresh(name)
+            finally:
+                with self._condition:
+                    self._loading.discard(name)
+
+    # A cada intervalo, agenda a atualização dos conjuntos de dados já carregados
+    def _schedule(self):
+        while not self._stop.wait(self._interval):
+            for name in list(self._snapshots):
+                self.request(name)
+
+    # Reconstrói um conjunto de dados; em caso de erro mantém a versão anterior
+    def refresh(self, name):
+        try:
+            self._snapshots[name] = self._builders[name]()
+            return True
+        except Exception:
+            logger.exception("Falha ao atualizar os dados de %s; mantendo a versão anterior", name)
+            return False
+        finally:
+            with self._condition:
+                self._attempts[name] += 1
+                self._condition.notify_all()
+
+    # Versões prontas de todos os conjuntos de dados já carregados
+    def snapshots(self):
+        return dict(self._snapshots)
+
+    def is_ready(self, name):
+        return name in self._snapshots
+
+    # Última versão pronta. Se ainda não houver nenhuma, pede a carga com prioridade e
+    # espera (até timeout) a próxima tentativa terminar (a já em andamento ou a pedida
+    # agora, mesmo depois de uma falha anterior); retorna None se ela falhar.
+    def get(self, name, timeout=None):
+        with self._condition:
+            if not self.is_ready(name):
+                attempts = self._attempts[name]
+                self.request(name, priority=True)
+                self._condition.wait_for(lambda: self._attempts[name] > attempts or self.is_ready(name), timeout)
+        return self._snapshots.get(name)
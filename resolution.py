@@ -0,0 +1,49 @@
+import pandas as pd
+
+import config
+
+# Política de resolução dos gráficos: limita o que vai para o navegador, para que o
+# tamanho da especificação e o custo de desenho não cresçam com o histórico guardado.
+
+OUTRAS = "Outras"
+
+
+# Série diária com no máximo max_pontos pontos: acima disso agrupa por semana (a partir
+# da segunda-feira) e, se ainda passar, por mês. Devolve o frame e a granularidade usada.
+def por_periodo(df, coluna, valor="quantidade", max_pontos=None):
+    max_pontos = max_pontos or config.CHART_MAX_POINTS
+    if len(df) <= max_pontos:
+        return df, "Dia"
+    datas = pd.to_datetime(df[coluna]).dt.normalize()
+    inicios = {
+        "Semana": datas - pd.to_timedelta(datas.dt.weekday, unit="D"),
+        "Mês": datas.dt.to_period("M").dt.start_time,
+    }
+    for granularidade, inicio in inicios.items():
+        result = df.assign(**{coluna: inicio}).groupby(coluna, as_index=False)[valor].sum()
+        if len(result) <= max_pontos:
+            break
+    return result, granularidade
+
+
+# Eixo com no máximo max_categorias valores: mantém os maiores pelo total e soma os
+# demais em "Outras", preservando as outras dimensões do frame (ex.: dentro_prazo)
+def limitar_categorias(df, coluna, valor="quantidade", max_categorias=None):
+    max_categorias = max_categorias or config.CHART_MAX_CATEGORIES
+    totais = df.groupby(coluna, dropna=False, observed=True)[valor].sum()
+    if len(totais) <= max_categorias:
+        return df
+    manter = totais.nlargest(max_categorias - 1).index
+    rotulos = df[coluna].astype(object).where(df[coluna].isin(manter), OUTRAS)
+    dims = [c for c in df.columns if c not in (coluna, valor)]
+    return (
+        df.assign(**{coluna: rotulos})
+        .groupby([coluna, *dims], dropna=False, sort=False)[valor].sum()
+        .reset_index()
+    )
+
+
+# Eixo de meses com no máximo max_categorias barras: os meses mais recentes
+def ultimos_meses(df, max_categorias=None):
+    max_categorias = max_categorias or config.CHART_MAX_CATEGORIES
+    return df.tail(max_categorias)
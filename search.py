@@ -0,0 +1,117 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import preprocess
+
+NGRAM = 3
+# Linhas processadas por vez na construção do índice (limita a memória temporária)
+CHUNK_ROWS = 100_000
+
+
+# Índice de trigramas sobre uma coluna de texto (ex.: 'summary'), sem diferenciar
+# maiúsculas. Responde buscas por substring e por prefixo com as posições das linhas.
+class SubstringIndex:
+    def __init__(self, values):
+        self.lowered = pd.Series(values).fillna("").astype(preprocess.TEXT_DTYPE).str.lower().reset_index(drop=True)
+        self.grams, self.starts, self.rows = self._build_postings(self.lowered)
+        # Ordem alfabética dos textos, para busca por prefixo com busca binária
+        self.order = pc.sort_indices(pa.array(self.lowered)).to_numpy()
+
+    # Arrays do índice, para publicar em config.SHARED_DIR (ver shared.publish)
+    def parts(self):
+        return {
+            "lowered": self.lowered.to_frame("lowered"),
+            "grams": self.grams,
+            "starts": self.starts,
+            "rows": self.rows,
+            "order": self.order,
+        }
+
+    # Índice sobre partes publicadas (mapeadas em memória), sem reconstruir nada
+    @classmethod
+    def from_parts(cls, parts):
+        index = cls.__new__(cls)
+        index.lowered = parts["lowered"]["lowered"]
+        index.grams, index.starts, index.rows, index.order = (parts[k] for k in ("grams", "starts", "rows", "order"))
+        return index
+
+    def __len__(self):
+        return len(self.lowered)
+
+    @property
+    def nbytes(self):
+        return int(self.lowered.memory_usage(deep=True) + self.grams.nbytes + self.starts.nbytes + self.rows.nbytes + self.order.nbytes)
+
+    # Trigrama codificado como inteiro: três code points de 21 bits
+    @staticmethod
+    def _encode(chars):
+        chars = chars.astype(np.int64)
+        return (chars[..., :-2] << 42) | (chars[..., 1:-1] << 21) | chars[..., 2:]
+
+    @classmethod
+    def _build_postings(cls, texts):
+        lengths = texts.str.len().to_numpy()
+        codes = []
+        rows = []
+        for start in range(0, len(texts), CHUNK_ROWS):
+            chunk = texts.iloc[start:start + CHUNK_ROWS]
+            width = int(lengths[start:start + CHUNK_ROWS].max(initial=0))
+            if width < NGRAM:
+                continue
+            # Matriz (linhas x caracteres) de code points, preenchida com zeros
+            chars = np.array(chunk.tolist(), dtype=f"<U{width}").view(np.uint32).reshape(len(chunk), width)
+            valid = np.arange(width - NGRAM + 1) < (lengths[start:start + CHUNK_ROWS, None] - NGRAM + 1)
+            codes.append(cls._encode(chars)[valid])
+            rows.append(np.nonzero(valid)[0] + start)
+        if not codes:
+            return np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32)
+
+        # Numera os trigramas distintos em ordem crescente e ordena os pares (trigrama,
+        # linha) por uma única chave inteira, descartando pares repetidos. As listas de
+        # linhas ficam contíguas em 'rows'; a do trigrama grams[i] vai de starts[i] a starts[i + 1].
+        ids, grams = pd.factorize(np.concatenate(codes), sort=True)
+        pairs = np.sort(ids.astype(np.int64) * len(texts) + np.concatenate(rows))
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+        ids, rows = np.divmod(pairs, len(texts))
+        starts = np.searchsorted(ids, np.arange(len(grams) + 1))
+        return grams, starts, rows.astype(np.int32)
+
+    def _postings(self, gram):
+        i = np.searchsorted(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return None
+        return self.rows[self.starts[i]:self.starts[i + 1]]
+
+    def _candidates(self, query):
+        grams = set(self._encode(np.array([ord(c) for c in query])).tolist())
+        postings = sorted((self._postings(g) for g in grams), key=lambda p: 0 if p is None else len(p))
+        if postings[0] is None:
+            return np.empty(0, dtype=np.int32)
+        result = postings[0]
+        for p in postings[1:]:
+            result = np.intersect1d(result, p, assume_unique=True)
+            if len(result) == 0:
+                break
+        return result
+
+    # Posições das linhas cujo texto contém a consulta
+    def search(self, query):
+        query = query.lower()
+        if len(query) < NGRAM:
+            # Consultas curtas não têm trigramas: varredura simples, sem regex
+            return np.flatnonzero(self.lowered.str.contains(query, regex=False).to_numpy())
+        candidates = self._candidates(query)
+        # Confirma os candidatos (ter todos os trigramas não garante a substring)
+        return candidates[self.lowered.iloc[candidates].str.contains(query, regex=False).to_numpy()]
+
+    # Posições das linhas cujo texto começa com a consulta
+    def prefix(self, query):
+        query = query.lower()
+        values = self.lowered.array
+        start = bisect.bisect_left(self.order, query, key=lambda i: values[i])
+        end = bisect.bisect_left(self.order, query + "\U0010ffff", key=lambda i: values[i])
+        return np.sort(self.order[start:end])
@@ -0,0 +1,129 @@
+import fcntl
+import glob
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import config
+import preprocess
+
+# Publicação dos conjuntos de dados para várias réplicas do app. Cada versão é um
+# diretório '<nome>.<versão>/' com o frame pré-processado ('frame.arrow') e as partes
+# derivadas (cubos, índices), e um arquivo '<nome>.version' aponta para a versão atual.
+# Frames viram Arrow IPC sem compressão e arrays numpy viram '.npy'; as réplicas mapeiam
+# tudo em memória, e as colunas e arrays apontam direto para o mapa, que o sistema
+# operacional compartilha entre os processos.
+
+# Versões mantidas por conjunto de dados (a atual e a anterior, que pode estar em uso)
+KEEP_VERSIONS = 2
+
+_lock = threading.Lock()
+_publisher_lock = None
+
+
+def version_path(name):
+    return os.path.join(config.SHARED_DIR, f"{name}.version")
+
+
+def data_path(name, version):
+    return os.path.join(config.SHARED_DIR, f"{name}.{version}")
+
+
+# Só um processo publica (e consulta a fonte): o que obtém o lock exclusivo do diretório,
+# mantido enquanto o processo viver. Se ele cair, outra réplica assume na próxima carga.
+def is_publisher():
+    global _publisher_lock
+    with _lock:
+        if _publisher_lock is None:
+            os.makedirs(config.SHARED_DIR, exist_ok=True)
+            f = open(os.path.join(config.SHARED_DIR, "publisher.lock"), "w")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                return False
+            _publisher_lock = f
+        return True
+
+
+def current_version(name):
+    try:
+        with open(version_path(name)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+# Grava uma parte: frame em Arrow, array em .npy e dicionário de partes em subdiretório
+def _write(path, value):
+    if isinstance(value, dict):
+        os.makedirs(path)
+        for part, part_value in value.items():
+            _write(os.path.join(path, part), part_value)
+    elif isinstance(value, np.ndarray):
+        np.save(path + ".npy", value)
+    else:
+        # Um lote só: recortes (take) de colunas em vários lotes copiam a coluna inteira
+        feather.write_feather(value, path + ".arrow", compression="uncompressed", chunksize=max(len(value), 1))
+
+
+# Grava uma nova versão (frame e partes derivadas) e troca o apontador de forma
+# atômica (diretório e arquivo temporários + rename)
+def publish(name, frame, parts=None):
+    os.makedirs(config.SHARED_DIR, exist_ok=True)
+    version = str(time.time_ns())
+    path = data_path(name, version)
+    _write(path + ".tmp", {"frame": frame, **(parts or {})})
+    os.replace(path + ".tmp", path)
+    with open(version_path(name) + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(version_path(name) + ".tmp", version_path(name))
+    _cleanup(name)
+    return version
+
+
+# Remove versões antigas e gravações interrompidas ('.tmp'); réplicas que ainda mapeiam
+# uma versão removida continuam lendo normalmente
+def _cleanup(name):
+    paths = [path for path in glob.glob(os.path.join(config.SHARED_DIR, f"{name}.*")) if os.path.isdir(path)]
+    versions = sorted((p for p in paths if not p.endswith(".tmp")), key=os.path.getmtime)
+    for path in versions[:-KEEP_VERSIONS] + [p for p in paths if p.endswith(".tmp")]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# Espera (até config.SHARED_WAIT segundos) existir uma versão publicada
+def wait_version(name):
+    deadline = time.monotonic() + config.SHARED_WAIT
+    version = current_version(name)
+    while version is None:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Nenhuma versão de {name} publicada em {config.SHARED_DIR}")
+        time.sleep(1)
+        version = current_version(name)
+    return version
+
+
+# Partes gravadas por _write, mapeadas em memória (somente leitura)
+def _read(path):
+    parts = {}
+    for entry in os.scandir(path):
+        part, ext = os.path.splitext(entry.name)
+        if entry.is_dir():
+            parts[entry.name] = _read(entry.path)
+        elif ext == ".npy":
+            parts[part] = np.asarray(np.load(entry.path, mmap_mode="r"))
+        elif ext == ".arrow":
+            table = pa.ipc.open_file(pa.memory_map(entry.path)).read_all()
+            parts[part] = table.to_pandas(split_blocks=True, types_mapper=preprocess.arrow_dtype)
+    return parts
+
+
+# Frame e partes derivadas de uma versão publicada, mapeados em memória
+def read(name, version):
+    parts = _read(data_path(name, version))
+    return parts.pop("frame"), parts
@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+import config
+import preprocess
+import queries
+
+
+# Lote Arrow convertido para pandas com os tipos do app, assim que chega da fonte
+def _to_pandas(batch):
+    return batch.to_pandas(types_mapper=preprocess.arrow_dtype)
+
+
+def _concat(chunks, columns=None):
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
+
+
+# Versão dos dados de um arquivo: muda sempre que ele é regravado
+def _file_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+# Fonte de dados: Athena (produção). Executa o SQL gerado por queries.build_sql e lê o
+# resultado pelo caminho Parquet do awswrangler (CTAS ou UNLOAD) em lotes. Com
+# cache_seconds, consultas idênticas dentro da janela reaproveitam o resultado anterior
+# mesmo que a view tenha mudado nesse meio tempo.
+#
+# Todas as fontes têm version(view): um identificador que muda quando os dados da view
+# mudam, ou None quando a fonte não sabe dizer (a carga incremental então consulta sempre).
+class AthenaSource:
+    def __init__(self, database, unload=False, s3_output=None, workgroup="primary", cache_seconds=0, chunksize=True):
+        self.database = database
+        self.unload = unload
+        self.s3_output = s3_output
+        self.workgroup = workgroup
+        self.cache_seconds = cache_seconds
+        self.chunksize = chunksize
+
+    def query(self, view, columns=None, date_column=None, start=None, end=None):
+        import awswrangler as wr
+        import boto3
+
+        sql = queries.build_sql(view, columns, date_column, start, end)
+        chunks = wr.athena.read_sql_query(
+            sql,
+            database=self.database,
+            ctas_approach=not self.unload,
+            unload_approach=self.unload,
+            s3_output=self.s3_output,
+            workgroup=self.workgroup,
+            chunksize=self.chunksize,
+            athena_cache_settings={"max_cache_seconds": self.cache_seconds},
+            # Sessão própria: as views são consultadas em paralelo, em threads diferentes
+            boto3_session=boto3.Session(),
+            pyarrow_additional_kwargs={"types_mapper": preprocess.arrow_dtype},
+        )
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+        return _concat(chunks, columns)
+
+    # Views do Athena não expõem a data da última alteração dos dados
+    def version(self, view):
+        return None
+
+
+# Fonte de dados: diretório local com um arquivo por view ('<view>.parquet' ou '<view>.csv'),
+# por exemplo extrações de produção para rodar e medir o dashboard sem AWS
+class LocalSource:
+    def __init__(self, directory, latency=0.0, chunksize=None):
+        self.directory = directory
+        self.latency = latency
+        self.chunksize = chunksize or config.FETCH_CHUNK_ROWS
+
+    def _path(self, view):
+        for ext in ("parquet", "csv"):
+            path = os.path.join(self.directory, f"{view}.{ext}")
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"View '{view}' não encontrada em {self.directory}")
+
+    def _chunks(self, view, columns):
+        path = self._path(view)
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            return map(_to_pandas, pq.ParquetFile(path).iter_batches(batch_size=self.chunksize, columns=columns))
+        import pyarrow.csv as pacsv
+
+        # Lotes por tamanho em bytes (o leitor CSV do Arrow não conta linhas)
+        return map(_to_pandas, pacsv.open_csv(path, convert_options=pacsv.ConvertOptions(include_columns=columns or [])))
+
+    def version(self, view):
+        return _file_version(self._path(view))
+
+    @staticmethod
+    def _filter(df, date_column, start, end):
+        if date_column is None or (start is None and end is None):
+            return df
+        dates = preprocess.to_naive(df[date_column])
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates <= pd.Timestamp(end)
+        return df[mask]
+
+    def query(self, view, columns=None, date_column=None, start=None, end=None):
+        time.sleep(self.latency)
+        chunks = (self._filter(chunk, date_column, start, end) for chunk in self._chunks(view, columns))
+        return _concat(chunks, columns)
+
+
+# Fonte de dados: DuckDB em processo, com as mesmas views do Athena. Usa as views de um
+# banco DuckDB existente e cria as que faltarem sobre os arquivos de um diretório local.
+class DuckDBSource:
+    def __init__(self, database=":memory:", directory=None, latency=0.0, chunksize=None):
+        import duckdb
+
+        self.latency = latency
+        self.chunksize = chunksize or config.FETCH_CHUNK_ROWS
+        self.connection = duckdb.connect(database)
+        # Arquivo de cada view criada sobre o diretório local
+        self.files = {}
+        if directory is not None and os.path.isdir(directory):
+            for view in config.VIEWS:
+                for ext, reader in (("parquet", "read_parquet"), ("csv", "read_csv_auto")):
+                    path = os.path.join(directory, f"{view}.{ext}")
+                    if os.path.exists(path):
+                        self.connection.execute(f"CREATE VIEW IF NOT EXISTS {view} AS SELECT * FROM {reader}('{path}')")
+                        self.files[view] = path
+                        break
+
+    def query(self, view, columns=None, date_column=None, start=None, end=None):
+        time.sleep(self.latency)
+        sql = queries.build_sql(view, columns, date_column, start, end)
+        # Cada thread usa seu próprio cursor sobre a mesma conexão
+        reader = self.connection.cursor().execute(sql).fetch_record_batch(self.chunksize)
+        return _concat(map(_to_pandas, reader), columns)
+
+    # Só views sobre arquivos têm versão; as de um banco existente são consultadas sempre
+    def version(self, view):
+        path = self.files.get(view)
+        return None if path is None else _file_version(path)
+
+
+def create_source(kind=None):
+    kind = kind or config.DATA_SOURCE
+    if kind == "athena":
+        return AthenaSource(
+            config.ATHENA_DATABASE,
+            unload=config.ATHENA_UNLOAD,
+            s3_output=config.ATHENA_S3_OUTPUT,
+            workgroup=config.ATHENA_WORKGROUP,
+            cache_seconds=config.ATHENA_CACHE_SECONDS,
+            chunksize=config.FETCH_CHUNK_ROWS,
+        )
+    if kind == "local":
+        return LocalSource(config.LOCAL_DATA_DIR, config.SOURCE_LATENCY)
+    if kind == "duckdb":
+        return DuckDBSource(config.DUCKDB_DATABASE, config.LOCAL_DATA_DIR, config.SOURCE_LATENCY)
+    raise ValueError(f"Fonte de dados desconhecida: {kind}")
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+# Fonte configurada em DASH_DATA_SOURCE, criada uma vez por processo (as views são
+# carregadas em paralelo, então a criação é protegida por um lock)
+def get_source():
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = create_source()
+    return _source
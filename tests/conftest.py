@@ -0,0 +1,38 @@
+# Verificações das estruturas de consulta (cubos, índices de tempo, índices de chaves e
+# de texto, motores de agregação) contra contas por força bruta sobre o frame, com os
+# dados sintéticos de benchmarks.generate, e da carga (requisitos e SQL, carga
+# incremental, atualizador e publicação em config.SHARED_DIR) em diretórios temporários.
+#
+# Uso: python -m pytest tests
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import preprocess  # noqa: E402
+from benchmarks import generate  # noqa: E402
+
+ROWS = 20_000
+
+# Mesmo modo do app: recortes não copiam os frames
+pd.set_option("mode.copy_on_write", True)
+
+
+@pytest.fixture(scope="session")
+def veiculos():
+    return preprocess.prepare_veiculos(generate.generate_veiculos(ROWS, seed=1))
+
+
+@pytest.fixture(scope="session")
+def kits():
+    return preprocess.prepare_kits(generate.generate_kits(ROWS, seed=1))
+
+
+# Frame de contagens como dicionário {chaves: quantidade}, para comparar resultados sem
+# depender da ordem das linhas nem dos tipos de cada motor
+def as_counts(df, keys, value="quantidade"):
+    rows = df[keys].astype(object).itertuples(index=False, name=None)
+    return {row: int(n) for row, n in zip(rows, df[value]) if n}
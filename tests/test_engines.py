@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregations
+import cube
+import engine
+import kpi
+import preprocess
+from conftest import as_counts
+
+
+@pytest.fixture(scope="module", params=["pandas", "duckdb"])
+def kind(request):
+    if request.param == "duckdb":
+        pytest.importorskip("duckdb")
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def veiculos_engine(veiculos, kind):
+    return engine.veiculos_engine(veiculos, cube.build_veiculos_cube(veiculos), kind)
+
+
+@pytest.fixture(scope="module")
+def kits_engine(kits, kind):
+    kpi_index = kpi.DistinctKeyIndex(kits["dt_faturado"], kits["key"])
+    return engine.kits_engine(kits, cube.build_kits_cube(kits), kpi_index, kind)
+
+
+def _counts(df, keys):
+    return as_counts(df.groupby(keys, observed=True).size().reset_index(name="quantidade"), keys)
+
+
+def test_veiculos_por_mes(veiculos, veiculos_engine):
+    expected = {(preprocess.mes_label(m),): n for (m,), n in _counts(veiculos, ["mes"]).items()}
+    assert as_counts(veiculos_engine.por_mes(), ["mes"]) == expected
+
+
+def test_veiculos_every_month(veiculos, veiculos_engine):
+    for mes in veiculos["mes"].unique():
+        recorte = veiculos[veiculos["mes"] == mes].assign(
+            Prazo=lambda df: df["dentro_prazo"].map(aggregations.PRAZO_LABELS),
+        )
+        assert as_counts(veiculos_engine.por_semana(mes), ["semana"]) == _counts(recorte, ["semana"])
+        assert as_counts(veiculos_engine.por_marca(mes), ["marca"]) == _counts(recorte, ["marca"])
+        assert as_counts(veiculos_engine.mapa_calor(mes), ["dia", "dentro_prazo"]) == _counts(recorte, ["dia", "dentro_prazo"])
+        assert as_counts(veiculos_engine.prazo_status(mes), ["dentro_prazo"]) == _counts(recorte, ["Prazo"])
+        assert as_counts(veiculos_engine.marca_prazo_status(mes), ["marca", "dentro_prazo"]) == _counts(recorte, ["marca", "Prazo"])
+        marca = recorte["marca"].mode().iloc[0]
+        assert as_counts(veiculos_engine.por_modelo(mes, marca), ["modelo"]) == _counts(recorte[recorte["marca"] == marca], ["modelo"])
+
+
+def test_kits_every_year_and_month(kits, kits_engine):
+    for ano in kits["ano"].unique():
+        expected = {(preprocess.mes_label(m),): n for (m,), n in _counts(kits[kits["ano"] == ano], ["mes"]).items()}
+        assert as_counts(kits_engine.por_mes(ano), ["mes"]) == expected
+    for mes in kits["mes"].unique():
+        assert as_counts(kits_engine.por_semana(mes), ["semana"]) == _counts(kits[kits["mes"] == mes], ["semana"])
+
+
+def test_kits_day_ranges(kits, kits_engine):
+    datas = kits["data"].unique()
+    rng = np.random.default_rng(0)
+    ranges = [np.sort(rng.choice(datas, 2)) for _ in range(30)]
+    # Períodos sem nenhum dia com dados, antes e depois da série
+    ranges += [(datas.min() - np.timedelta64(30, "D"), datas.min() - np.timedelta64(1, "D"))]
+    ranges += [(datas.max() + np.timedelta64(1, "D"), datas.max() + np.timedelta64(30, "D"))]
+    for inicio, fim in ranges:
+        recorte = kits[(kits["data"] >= inicio) & (kits["data"] <= fim)]
+        assert as_counts(kits_engine.por_dia(inicio, fim), ["dt_faturado"]) == _counts(recorte, ["data"])
+        assert kits_engine.distintos(inicio, fim) == recorte["key"].nunique()
+
+
+def test_kits_cards(kits, kits_engine):
+    for now in [kits["dt_faturado"].max(), kits["dt_faturado"].iloc[len(kits) // 2]]:
+        dia = now.normalize()
+        segunda = dia - pd.Timedelta(days=dia.weekday())
+        expected = {
+            "d1": kits.loc[kits["data"] == dia - pd.Timedelta(days=1), "key"].nunique(),
+            "semana": kits.loc[(kits["data"] >= segunda) & (kits["data"] < segunda + pd.Timedelta(days=7)), "key"].nunique(),
+            "mes": kits.loc[kits["mes"] == preprocess.current_period_code(now), "key"].nunique(),
+        }
+        assert kits_engine.cards(now.to_pydatetime()) == expected
+
+
+def test_rows_in_covers_the_scanned_slices(veiculos, kits, veiculos_engine, kits_engine):
+    assert veiculos_engine.rows_in("por_mes") == veiculos_engine.rows
+    assert sum(veiculos_engine.rows_in("por_modelo", mes, "x") for mes in veiculos["mes"].unique()) == veiculos_engine.rows
+    assert sum(kits_engine.rows_in("por_mes", ano) for ano in kits["ano"].unique()) == kits_engine.rows
+    assert sum(kits_engine.rows_in("por_semana", mes) for mes in kits["mes"].unique()) == kits_engine.rows
+    assert kits_engine.rows_in("por_dia", kits["data"].min(), kits["data"].max()) == kits_engine.rows
+    assert kits_engine.rows_in("cards", None) is None
@@ -0,0 +1,76 @@
+import itertools
+import os
+
+import pandas as pd
+import pytest
+
+import config
+import incremental
+import queries
+import sources
+
+VIEW = "vw_vidros_kits"
+REQ = queries.Requirement(VIEW, ["key", "dt_faturado"])
+
+# Segundos somados ao mtime a cada regravação: a versão da fonte muda mesmo quando o
+# sistema de arquivos não distingue duas gravações seguidas
+_bump = itertools.count(1)
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(config, "LOOKBACK_DAYS", 7)
+    source = sources.LocalSource(str(tmp_path / "data"))
+    os.makedirs(source.directory)
+    monkeypatch.setattr(sources, "_source", source)
+    return source
+
+
+def _write(source, rows):
+    path = os.path.join(source.directory, f"{VIEW}.parquet")
+    pd.DataFrame(rows, columns=REQ.columns).to_parquet(path, index=False)
+    mtime = os.stat(path).st_mtime_ns + next(_bump) * 10**9
+    os.utime(path, ns=(mtime, mtime))
+
+
+def _rows(df):
+    return sorted(zip(df["key"], pd.to_datetime(df["dt_faturado"])))
+
+
+def _days_ago(days):
+    return pd.Timestamp.now().normalize() - pd.Timedelta(days=days)
+
+
+def test_future_row_does_not_hold_back_the_cutoff(source):
+    futuro = pd.Timestamp.now() + pd.Timedelta(days=30)
+    _write(source, [("a", _days_ago(20)), ("b", futuro)])
+    assert incremental.watermark(incremental.load_view(REQ), "dt_faturado") <= pd.Timestamp.now()
+
+    rows = [("a", _days_ago(20)), ("b", futuro), ("c", _days_ago(1))]
+    _write(source, rows)
+    assert _rows(incremental.load_view(REQ)) == sorted(rows)
+
+
+def test_late_edit_inside_the_lookback_replaces_the_old_row(source):
+    _write(source, [("a", _days_ago(30)), ("b", _days_ago(3)), ("c", _days_ago(1))])
+    incremental.load_view(REQ)
+
+    rows = [("a", _days_ago(30)), ("b2", _days_ago(3)), ("c", _days_ago(1))]
+    _write(source, rows)
+    assert _rows(incremental.load_view(REQ)) == sorted(rows)
+
+
+def test_unchanged_version_skips_the_query(source, monkeypatch):
+    _write(source, [("a", _days_ago(10)), ("b", _days_ago(1))])
+    first = incremental.load_view(REQ)
+
+    calls = []
+    query = source.query
+    monkeypatch.setattr(source, "query", lambda *args, **kwargs: calls.append(args) or query(*args, **kwargs))
+    assert _rows(incremental.load_view(REQ)) == _rows(first)
+    assert calls == []
+
+    _write(source, [("a", _days_ago(10)), ("b", _days_ago(1)), ("c", _days_ago(0))])
+    assert len(incremental.load_view(REQ)) == 3
+    assert len(calls) == 1
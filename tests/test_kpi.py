@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+import kpi
+
+
+def test_counts_match_nunique(kits):
+    index = kpi.DistinctKeyIndex(kits["dt_faturado"], kits["key"])
+    dias = kits["data"]
+    semanas = dias - pd.to_timedelta(dias.dt.weekday, unit="D")
+    rng = np.random.default_rng(0)
+
+    for dia in rng.choice(dias.unique(), 30):
+        dia = pd.Timestamp(dia)
+        assert index.count_day(dia) == kits.loc[dias == dia, "key"].nunique()
+        segunda = dia - pd.Timedelta(days=dia.weekday())
+        assert index.count_week(dia) == kits.loc[semanas == segunda, "key"].nunique()
+    for mes in kits["mes"].unique():
+        assert index.count_month(mes) == kits.loc[kits["mes"] == mes, "key"].nunique()
+    for inicio, fim in [np.sort(rng.choice(dias.unique(), 2)) for _ in range(30)]:
+        assert index.count_range(inicio, fim) == kits.loc[(dias >= inicio) & (dias <= fim), "key"].nunique()
+
+
+def test_missing_days_and_keys():
+    dates = pd.Series(pd.to_datetime(["2024-01-01", "2024-01-01", None, "2024-01-03"]))
+    keys = pd.Series(["A", "A", "B", None])
+    index = kpi.DistinctKeyIndex(dates, keys)
+    assert index.count_day("2024-01-01") == 1
+    assert index.count_day("2024-01-02") == 0
+    assert index.count_day("2024-01-03") == 0
+    assert index.count_range("2023-12-01", "2024-02-01") == 1
+
+
+def test_parts_round_trip(kits):
+    index = kpi.DistinctKeyIndex(kits["dt_faturado"], kits["key"])
+    restored = kpi.DistinctKeyIndex.from_parts(index.parts())
+    inicio, fim = kits["data"].min(), kits["data"].max()
+    assert restored.count_range(inicio, fim) == index.count_range(inicio, fim)
+    assert restored.weeks == index.weeks and restored.months == index.months
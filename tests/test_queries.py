@@ -0,0 +1,44 @@
+import pandas as pd
+
+import queries
+from queries import Requirement
+
+
+def test_combine_unions_columns_and_widens_the_period():
+    combined = queries.combine([
+        Requirement("vw_veiculos_finalizados", ["summary", "marca"], pd.Timestamp("2024-03-01"), pd.Timestamp("2024-06-30")),
+        Requirement("vw_veiculos_finalizados", ["marca", "modelo"], pd.Timestamp("2024-01-01"), pd.Timestamp("2024-04-30")),
+        Requirement("vw_vidros_kits", ["key"]),
+    ])
+    veiculos = combined["vw_veiculos_finalizados"]
+    assert veiculos.columns == ["summary", "marca", "dt_finalizacao", "modelo"]
+    assert (veiculos.start, veiculos.end) == (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-06-30"))
+    # Sem chave configurada, só a coluna de data é acrescentada
+    assert combined["vw_vidros_kits"] == Requirement("vw_vidros_kits", ["key", "dt_faturado"])
+
+
+def test_combine_open_period_wins():
+    combined = queries.combine([
+        Requirement("vw_vidros_kits", ["key"], pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-01")),
+        Requirement("vw_vidros_kits", ["dt_faturado"]),
+    ])
+    assert combined["vw_vidros_kits"] == Requirement("vw_vidros_kits", ["key", "dt_faturado"])
+
+
+def test_requirements_cover_every_dashboard_column():
+    for req in queries.all_requirements():
+        assert set(req.columns) <= set(queries.requirement_for(req.view).columns)
+
+
+def test_build_sql():
+    assert queries.build_sql("vw_vidros_kits") == "SELECT * FROM vw_vidros_kits"
+    assert queries.build_sql("vw_vidros_kits", ["key", "dt_faturado"], "dt_faturado") == "SELECT key, dt_faturado FROM vw_vidros_kits"
+    assert queries.build_sql(
+        "vw_vidros_kits", ["key"], "dt_faturado", pd.Timestamp("2024-01-01"), "2024-01-31 23:59:59",
+    ) == (
+        "SELECT key FROM vw_vidros_kits"
+        " WHERE dt_faturado >= TIMESTAMP '2024-01-01 00:00:00' AND dt_faturado <= TIMESTAMP '2024-01-31 23:59:59'"
+    )
+    assert queries.build_sql("vw_vidros_kits", None, "dt_faturado", end=pd.Timestamp("2024-02-01 12:30")) == (
+        "SELECT * FROM vw_vidros_kits WHERE dt_faturado <= TIMESTAMP '2024-02-01 12:30:00'"
+    )
@@ -0,0 +1,45 @@
+import pytest
+
+import refresh
+
+
+# Construtor que falha nas primeiras 'failures' chamadas e depois retorna um Dataset
+class FlakyBuilder:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("fonte indisponível")
+        return f"dataset {self.calls}"
+
+
+@pytest.fixture
+def refresher():
+    refreshers = []
+
+    def create(builder):
+        refreshers.append(refresh.Refresher({"veiculos": builder}, interval=3600))
+        return refreshers[-1]
+
+    yield create
+    for r in refreshers:
+        r.stop()
+
+
+def test_get_after_a_failed_build_waits_for_the_retry(refresher):
+    builder = FlakyBuilder(failures=1)
+    r = refresher(builder)
+    assert r.refresh("veiculos") is False
+    assert r.start().get("veiculos", timeout=10) == "dataset 2"
+    assert builder.calls == 2
+
+
+def test_get_returns_none_when_its_own_attempt_fails(refresher):
+    builder = FlakyBuilder(failures=1)
+    r = refresher(builder).start()
+    assert r.get("veiculos", timeout=10) is None
+    assert r.get("veiculos", timeout=10) == "dataset 2"
+    assert r.get("veiculos", timeout=10) == "dataset 2"
@@ -0,0 +1,35 @@
+import aggregations
+import cube
+import engine
+import kpi
+import resolution
+
+
+def test_por_periodo_keeps_totals_within_budget(kits):
+    kits_engine = engine.kits_engine(kits, cube.build_kits_cube(kits), kpi.DistinctKeyIndex(kits["dt_faturado"], kits["key"]))
+    diario = kits_engine.por_dia(kits["data"].min(), kits["data"].max())
+    for max_pontos, granularidade in [(len(diario), "Dia"), (len(diario) // 5, "Semana"), (100, "Mês")]:
+        result, usada = resolution.por_periodo(diario, "dt_faturado", max_pontos=max_pontos)
+        assert usada == granularidade
+        assert len(result) <= max_pontos
+        assert result["quantidade"].sum() == diario["quantidade"].sum()
+
+
+def test_limitar_categorias_keeps_totals_and_split(veiculos):
+    mes = veiculos["mes"].max()
+    recorte = cube.build_veiculos_cube(veiculos[veiculos["mes"] == mes])
+    marcas = aggregations.veiculos_por_marca(recorte)
+    result = resolution.limitar_categorias(marcas, "marca", max_categorias=3)
+    assert len(result) == 3
+    assert resolution.OUTRAS in set(result["marca"])
+    assert result["quantidade"].sum() == marcas["quantidade"].sum()
+
+    prazo = aggregations.marca_prazo_status(recorte)
+    result = resolution.limitar_categorias(prazo, "marca", max_categorias=3)
+    assert result["marca"].nunique() == 3
+    assert result.groupby("dentro_prazo")["quantidade"].sum().equals(prazo.groupby("dentro_prazo")["quantidade"].sum())
+
+
+def test_ultimos_meses(veiculos):
+    por_mes = aggregations.veiculos_por_mes(cube.build_veiculos_cube(veiculos))
+    assert resolution.ultimos_meses(por_mes, 10).equals(por_mes.tail(10))
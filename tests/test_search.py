@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from search import SubstringIndex
+
+QUERIES = ["os", "OS 1", "12", "123", "marca 0", "modelo 1", "troca", "- marca", "zzz", "ção", "SUBSTITUIÇÃO"]
+
+
+@pytest.fixture(scope="module")
+def summary():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    servicos = np.array(["Troca de vidro", "Substituição de para-brisa", "Reparo"])
+    return pd.Series([
+        f"OS {os_number} - MARCA {marca:02d} MODELO {modelo} - {servico}"
+        for os_number, marca, modelo, servico in zip(
+            rng.permutation(n) + 100_000, rng.integers(0, 40, n), rng.integers(0, 25, n), rng.choice(servicos, n),
+        )
+    ] + [None, ""])
+
+
+def test_search_and_prefix_match_scans(summary):
+    index = SubstringIndex(summary)
+    lowered = summary.fillna("").str.lower()
+    for query in QUERIES + [summary.iloc[5].split()[1]]:
+        expected = np.flatnonzero(lowered.str.contains(query.lower(), regex=False).to_numpy())
+        assert np.array_equal(np.sort(index.search(query)), expected), query
+        expected = np.flatnonzero(lowered.str.startswith(query.lower()).to_numpy())
+        assert np.array_equal(index.prefix(query), expected), query
+
+
+def test_parts_round_trip(summary):
+    index = SubstringIndex(summary)
+    restored = SubstringIndex.from_parts(index.parts())
+    for query in QUERIES:
+        assert np.array_equal(restored.search(query), index.search(query))
+        assert np.array_equal(restored.prefix(query), index.prefix(query))
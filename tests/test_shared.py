@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import config
+import datasets
+import preprocess
+import shared
+from benchmarks import generate
+from conftest import ROWS
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SHARED_DIR", str(tmp_path))
+    return tmp_path
+
+
+# Veículos com os textos em Arrow, como chegam das fontes (ver sources._to_pandas)
+@pytest.fixture(scope="module")
+def veiculos_arrow():
+    raw = pa.Table.from_pandas(generate.generate_veiculos(ROWS, seed=1), preserve_index=False)
+    return preprocess.prepare_veiculos(raw.to_pandas(types_mapper=preprocess.arrow_dtype))
+
+
+# Publica o frame com as partes derivadas e monta o Dataset sobre a versão mapeada
+def _round_trip(name, frame, derive):
+    private = derive(frame)
+    version = shared.publish(name, frame, datasets._parts(private))
+    assert shared.current_version(name) == version
+    return private, derive(*shared.read(name, version))
+
+
+def _assert_same_frame(mapped, private):
+    assert mapped.dtypes.to_dict() == private.dtypes.to_dict()
+    pd.testing.assert_frame_equal(mapped, private)
+
+
+def test_veiculos_round_trip(shared_dir, veiculos_arrow):
+    private, mapped = _round_trip("veiculos", veiculos_arrow, datasets._derive_veiculos)
+    _assert_same_frame(mapped.frame, private.frame)
+    _assert_same_frame(mapped.cube, private.cube)
+    assert mapped.marcas == private.marcas
+    for query in ["OS 11", "marca 2", "modelo 1 -", "vidro", "xyz", ""]:
+        assert np.array_equal(mapped.index.search(query), private.index.search(query)), query
+        assert np.array_equal(mapped.index.prefix(query), private.index.prefix(query)), query
+    mes = private.engine.meses.keys[-1]
+    pd.testing.assert_frame_equal(mapped.engine.por_marca(mes), private.engine.por_marca(mes))
+
+
+def test_kits_round_trip(shared_dir, kits):
+    private, mapped = _round_trip("kits", kits, datasets._derive_kits)
+    _assert_same_frame(mapped.frame, private.frame)
+    _assert_same_frame(mapped.cube, private.cube)
+    for dia in private.engine.dias.keys[::50]:
+        assert mapped.kpi.count_day(dia) == private.kpi.count_day(dia)
+        assert mapped.kpi.count_week(dia) == private.kpi.count_week(dia)
+        assert mapped.kpi.count_range(private.engine.dias.keys[0], dia) == private.kpi.count_range(private.engine.dias.keys[0], dia)
+    for mes in private.engine.meses.keys:
+        assert mapped.kpi.count_month(mes) == private.kpi.count_month(mes)
+
+
+def test_publish_keeps_the_last_versions(shared_dir, kits):
+    for _ in range(shared.KEEP_VERSIONS + 2):
+        version = shared.publish("kits", kits.head(10))
+    versions = sorted(p.name for p in shared_dir.iterdir() if p.is_dir())
+    assert len(versions) == shared.KEEP_VERSIONS
+    assert f"kits.{version}" in versions
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from timeindex import TimeIndex
+
+
+def _mask_rows(values, inicio, fim):
+    return np.flatnonzero((values >= inicio) & (values <= fim))
+
+
+def test_slice_matches_mask_for_every_value_and_range():
+    values = np.sort(np.random.default_rng(0).integers(0, 50, 1_000))
+    index = TimeIndex(values)
+    for v in range(-2, 53):
+        rows = np.arange(len(values))[index.slice(v)]
+        assert np.array_equal(rows, _mask_rows(values, v, v))
+    for inicio, fim in [(-5, 3), (10, 20), (48, 60), (20, 10), (51, 70)]:
+        rows = np.arange(len(values))[index.slice(inicio, fim)]
+        assert np.array_equal(rows, _mask_rows(values, inicio, fim))
+
+
+def test_frame_months_and_days(veiculos, kits):
+    meses = TimeIndex(veiculos["mes"])
+    for mes in veiculos["mes"].unique():
+        assert veiculos.iloc[meses.slice(mes)].equals(veiculos[veiculos["mes"] == mes])
+
+    dias = TimeIndex(kits["data"])
+    datas = kits["data"].unique()
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        inicio, fim = np.sort(rng.choice(datas, 2))
+        expected = kits[(kits["data"] >= inicio) & (kits["data"] <= fim)]
+        assert kits.iloc[dias.slice(inicio, fim)].equals(expected)
+
+
+def test_empty_and_unsorted():
+    empty = TimeIndex(np.array([], dtype=np.int32))
+    assert len(empty) == 0
+    assert empty.slice(3, 5) == slice(0, 0)
+    with pytest.raises(ValueError):
+        TimeIndex([3, 1, 2])
@@ -0,0 +1,26 @@
+import numpy as np
+
+
+# Fronteiras de um frame ordenado por uma coluna de tempo (código do mês, ano ou dia).
+# Cada valor ocupa um trecho contíguo de linhas, então qualquer valor ou intervalo vira
+# um slice por searchsorted sobre os valores distintos, sem comparar a coluna inteira.
+class TimeIndex:
+    def __init__(self, values):
+        values = np.asarray(values)
+        if len(values) > 1 and (values[1:] < values[:-1]).any():
+            raise ValueError("TimeIndex exige valores em ordem crescente")
+        bounds = np.flatnonzero(values[1:] != values[:-1]) + 1
+        self.keys = values[np.r_[0, bounds]] if len(values) else values
+        self.starts = np.r_[0, bounds, len(values)] if len(values) else np.zeros(1, dtype=np.int64)
+
+    def __len__(self):
+        return int(self.starts[-1])
+
+    def _key(self, value):
+        return np.array(value).astype(self.keys.dtype)
+
+    # Linhas com valor entre inicio e fim (inclusive); sem fim, só as do valor inicio
+    def slice(self, inicio, fim=None):
+        lo = np.searchsorted(self.keys, self._key(inicio), side="left")
+        hi = np.searchsorted(self.keys, self._key(inicio if fim is None else fim), side="right")
+        return slice(int(self.starts[lo]), int(self.starts[max(lo, hi)]))